@@ -0,0 +1,272 @@
+"""Gym-style environments for training and evaluating bot pilots.
+
+AsteroidsEnv wraps one headless GameSimulation behind reset() and step()
+with a flat float32 observation. VecAsteroidsEnv steps N independent worlds
+in lockstep in one process and returns batched arrays, starting a new
+episode in each world as its old one ends. Neither opens a window or
+imports pygame. Running the module times a vectorized env under a random
+policy and prints env-steps per second:
+
+    python asteroids_env.py --envs 1,16,64,256 --steps 50000
+"""
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+import geometric_asteroids as game
+
+# An action is three integers, like a gym MultiDiscrete(ACTION_NVEC):
+# rotate (0 left, 1 none, 2 right), thrust (0 off, 1 on), fire (0 off, 1 on)
+ACTION_NVEC = (3, 2, 2)
+# The InputCommand for every action, indexed by rotate * 4 + thrust * 2 + fire
+COMMANDS = [game.InputCommand(rotate=rotate - 1, thrust=bool(thrust), fire=bool(fire))
+            for rotate in range(3) for thrust in range(2) for fire in range(2)]
+
+# Observation layout: the player, the nearest enemies and hostile projectiles
+# (closest first, empty slots all zero), then the boss. Positions are relative
+# to the player and scaled by the screen size, velocities by 10 px per step.
+MAX_ENEMIES = 8
+MAX_PROJECTILES = 16
+# x, y, vel_x, vel_y, cos and sin of the heading, lives / 3, invulnerable, shot ready
+PLAYER_FEATURES = 9
+# present, dx, dy, vel_x, vel_y, size / 50, shape one-hot (4), role one-hot (4)
+ENEMY_FEATURES = 14
+# present, dx, dy, vel_x, vel_y
+PROJECTILE_FEATURES = 5
+# present, dx, dy, size / 100, health fraction
+BOSS_FEATURES = 5
+ENEMY_OFFSET = PLAYER_FEATURES
+PROJECTILE_OFFSET = ENEMY_OFFSET + MAX_ENEMIES * ENEMY_FEATURES
+BOSS_OFFSET = PROJECTILE_OFFSET + MAX_PROJECTILES * PROJECTILE_FEATURES
+OBS_SIZE = BOSS_OFFSET + BOSS_FEATURES
+
+SHAPE_INDEX = {shape: i for i, shape in enumerate(game.GeometricEnemy.SHAPES)}
+SCALE = np.array([1 / game.WIDTH, 1 / game.HEIGHT, 0.1, 0.1])
+
+# Reward per point of score, and for each life lost
+REWARD_SCORE = 0.01
+REWARD_LIFE = -1.0
+
+
+def new_world(seed, ship='basic', wave=1, lives=3):
+    """A headless simulation set up for an episode; particles are switched off."""
+    sim = game.GameSimulation(ship, seed=seed)
+    sim.particles.emit_scale = 0
+    sim.player.lives = lives
+    if wave > 1:
+        sim.enemies.clear()
+        sim.wave = wave
+        sim.spawn_wave()
+    return sim
+
+
+def nearest_slots(rows, px, py, count):
+    """Rank `rows` (world, x, y, ...) by distance to their world's player.
+
+    Returns the worlds, slot indices and rows of those within the `count`
+    nearest of their world, with x and y replaced by offsets from the player.
+    """
+    world = rows[:, 0].astype(np.int64)
+    rows[:, 1] -= px[world]
+    rows[:, 2] -= py[world]
+    order = np.lexsort((rows[:, 1] ** 2 + rows[:, 2] ** 2, world))
+    world, rows = world[order], rows[order]
+    rank = np.arange(len(world)) - np.searchsorted(world, world)
+    keep = rank < count
+    return world[keep], rank[keep], rows[keep]
+
+
+def observe(sims, out):
+    """Write the observation of every simulation in `sims` into the rows of `out`."""
+    out[:] = 0
+    players = [sim.player for sim in sims]
+    px = np.array([p.x for p in players], dtype=float)
+    py = np.array([p.y for p in players], dtype=float)
+    out[:, 0] = px / game.WIDTH
+    out[:, 1] = py / game.HEIGHT
+    for i, p in enumerate(players):
+        out[i, 2:9] = (p.vel_x * 0.1, p.vel_y * 0.1, np.cos(np.radians(p.angle)), np.sin(np.radians(p.angle)),
+                       p.lives / 3, p.invulnerable > 0, p.shoot_cooldown == 0)
+
+    enemies = [(w, e.x, e.y, e.vel_x, e.vel_y, e.size, SHAPE_INDEX[e.shape_type], e.role_code)
+               for w, sim in enumerate(sims) for e in sim.enemies]
+    if enemies:
+        world, slot, rows = nearest_slots(np.array(enemies, dtype=float), px, py, MAX_ENEMIES)
+        base = ENEMY_OFFSET + slot * ENEMY_FEATURES
+        out[world, base] = 1
+        for j in range(4):
+            out[world, base + 1 + j] = rows[:, 1 + j] * SCALE[j]
+        out[world, base + 5] = rows[:, 5] / 50
+        out[world, base + 6 + rows[:, 6].astype(np.int64)] = 1
+        out[world, base + 10 + rows[:, 7].astype(np.int64)] = 1
+
+    projectiles = [(w, b.x, b.y, b.vel_x, b.vel_y) for w, sim in enumerate(sims) for b in sim.boss_projectiles]
+    if projectiles:
+        world, slot, rows = nearest_slots(np.array(projectiles, dtype=float), px, py, MAX_PROJECTILES)
+        base = PROJECTILE_OFFSET + slot * PROJECTILE_FEATURES
+        out[world, base] = 1
+        for j in range(4):
+            out[world, base + 1 + j] = rows[:, 1 + j] * SCALE[j]
+
+    for i, sim in enumerate(sims):
+        boss = sim.boss
+        if boss:
+            out[i, BOSS_OFFSET:] = (1, (boss.x - px[i]) / game.WIDTH, (boss.y - py[i]) / game.HEIGHT,
+                                    boss.size / 100, max(0.0, boss.health / boss.max_health))
+    return out
+
+
+class AsteroidsEnv:
+    """One headless game behind the gym API.
+
+    reset() returns (observation, info) and step(action) returns
+    (observation, reward, terminated, truncated, info). An episode terminates
+    at game over and is truncated after max_steps steps.
+    """
+    observation_size = OBS_SIZE
+    action_nvec = ACTION_NVEC
+
+    def __init__(self, ship='basic', wave=1, lives=3, max_steps=5 * 60 * game.FPS, seed=None):
+        self.ship, self.wave, self.lives = ship, wave, lives
+        self.max_steps = max_steps
+        self.seeds = random.Random(seed)
+        self.obs = np.zeros((1, OBS_SIZE), dtype=np.float32)
+        self.sim = None
+        self.steps = 0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seeds.seed(seed)
+        self.sim = new_world(self.seeds.randrange(1 << 32), self.ship, self.wave, self.lives)
+        self.steps = 0
+        return observe([self.sim], self.obs)[0].copy(), self.info()
+
+    def step(self, action):
+        sim = self.sim
+        rotate, thrust, fire = action
+        score, lives = sim.score, sim.player.lives
+        sim.step(COMMANDS[rotate * 4 + thrust * 2 + fire])
+        self.steps += 1
+        reward = (sim.score - score) * REWARD_SCORE + (lives - sim.player.lives) * REWARD_LIFE
+        return (observe([sim], self.obs)[0].copy(), reward, sim.game_over, self.steps >= self.max_steps,
+                self.info())
+
+    def info(self):
+        sim = self.sim
+        return {'score': sim.score, 'wave': sim.wave, 'lives': sim.player.lives, 'steps': self.steps}
+
+
+class VecAsteroidsEnv:
+    """`n` independent games stepped in lockstep, with batched array outputs.
+
+    step(actions) takes an (n, 3) integer array and returns observations
+    (n, OBS_SIZE), rewards, terminated and truncated flags, each with n rows,
+    and an info dict of arrays. A world whose episode ended is reset
+    straight away: its observation row is the first of the new episode, and
+    info['final_observation'], 'episode_return' and 'episode_length' hold
+    the finished one.
+    """
+    observation_size = OBS_SIZE
+    action_nvec = ACTION_NVEC
+
+    def __init__(self, n, ship='basic', wave=1, lives=3, max_steps=5 * 60 * game.FPS, seed=None):
+        self.n = n
+        self.ship, self.wave, self.lives = ship, wave, lives
+        self.max_steps = max_steps
+        self.seeds = random.Random(seed)
+        self.sims = []
+        self.obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.returns = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives_left = np.zeros(n, dtype=np.int64)
+
+    def new_world(self):
+        return new_world(self.seeds.randrange(1 << 32), self.ship, self.wave, self.lives)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seeds.seed(seed)
+        self.sims = [self.new_world() for _ in range(self.n)]
+        self.steps[:] = 0
+        self.returns[:] = 0
+        self.score[:] = 0
+        self.lives_left[:] = self.lives
+        return observe(self.sims, self.obs).copy(), self.info()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        sims = self.sims
+        for sim, index in zip(sims, (actions[:, 0] * 4 + actions[:, 1] * 2 + actions[:, 2]).tolist()):
+            sim.step(COMMANDS[index])
+        self.steps += 1
+        score = np.array([sim.score for sim in sims], dtype=np.int64)
+        lives = np.array([sim.player.lives for sim in sims], dtype=np.int64)
+        rewards = (score - self.score) * REWARD_SCORE + (self.lives_left - lives) * REWARD_LIFE
+        self.score, self.lives_left = score, lives
+        self.returns += rewards
+        terminated = np.array([sim.game_over for sim in sims])
+        truncated = self.steps >= self.max_steps
+        obs = observe(sims, self.obs).copy()
+        info = self.info()
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            info['final_observation'] = obs.copy()
+            info['episode_return'] = self.returns.copy()
+            info['episode_length'] = self.steps.copy()
+            for i in done.tolist():
+                sims[i] = self.new_world()
+            obs[done] = observe([sims[i] for i in done.tolist()], np.zeros((len(done), OBS_SIZE), np.float32))
+            self.steps[done] = 0
+            self.returns[done] = 0
+            self.score[done] = 0
+            self.lives_left[done] = self.lives
+        return obs, rewards, terminated, truncated, info
+
+    def info(self):
+        return {'score': self.score.copy(), 'wave': np.array([sim.wave for sim in self.sims]),
+                'lives': self.lives_left.copy()}
+
+
+def bench(n, steps, seed=0, **kwargs):
+    """Step a VecAsteroidsEnv of `n` worlds under a random policy; returns env-steps/s and episodes."""
+    env = VecAsteroidsEnv(n, seed=seed, **kwargs)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    rounds = max(1, steps // n)
+    actions = rng.integers(0, ACTION_NVEC, (rounds, n, len(ACTION_NVEC)))
+    episodes = 0
+    t0 = time.perf_counter()
+    for r in range(rounds):
+        _, _, terminated, truncated, _ = env.step(actions[r])
+        episodes += int((terminated | truncated).sum())
+    return rounds * n / (time.perf_counter() - t0), episodes
+
+
+def parse_list(text):
+    return [int(v) for v in text.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--envs', type=parse_list, default=[1, 16, 64, 256],
+                        help='comma-separated world counts to time')
+    parser.add_argument('--steps', type=int, default=50000, help='env-steps per timing')
+    parser.add_argument('--ship', default='basic', choices=game.SHIP_TYPES)
+    parser.add_argument('--wave', type=int, default=1, help='starting wave')
+    parser.add_argument('--lives', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"observation {OBS_SIZE} floats, actions MultiDiscrete{ACTION_NVEC}")
+    for n in args.envs:
+        rate, episodes = bench(n, args.steps, args.seed, ship=args.ship, wave=args.wave, lives=args.lives)
+        print(f"{n:>5} envs  {rate:>9.0f} env-steps/s  {episodes} episodes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
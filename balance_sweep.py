@@ -0,0 +1,151 @@
+"""Headless balance sweep for Geometric Asteroids.
+
+Plays a grid of (ship, starting wave, seed) runs with a bot pilot, spread over
+a process pool, and reports survival time, waves cleared, score, coins and
+damage taken per ship and starting wave. Boss waves (every 4th) also report
+the boss type they start on:
+
+    python balance_sweep.py --seeds 50 --waves 1,5,9,12,13 --out sweep.csv
+"""
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import geometric_asteroids as game
+
+SHIPS = ['basic', 'interceptor', 'tank', 'shotgun', 'sniper']
+FIELDS = ['ship', 'start_wave', 'boss_type', 'seed', 'pilot', 'frames', 'survival_s', 'died',
+          'waves_cleared', 'final_wave', 'score', 'coins', 'damage_taken']
+
+
+def nearest(sim, objs):
+    px, py = sim.player.x, sim.player.y
+    return min(objs, key=lambda e: (e.x - px) ** 2 + (e.y - py) ** 2, default=None)
+
+
+def turret_pilot(sim, frame):
+    # Stays put, turning toward and firing at the nearest target
+    target = nearest(sim, sim.enemies + ([sim.boss] if sim.boss else []))
+    cmd = game.InputCommand(fire=True)
+    if target:
+        cmd.aim_angle = math.degrees(math.atan2(target.y - sim.player.y, target.x - sim.player.x))
+    return cmd
+
+
+def bot_pilot(sim, frame):
+    # Fires at the nearest target, but turns away and thrusts when a hostile gets close
+    px, py = sim.player.x, sim.player.y
+    threat = nearest(sim, sim.enemies + sim.boss_projectiles)
+    if threat is not None:
+        reach = (getattr(threat, 'size', None) or threat.radius) + sim.player.radius + 60
+        if (threat.x - px) ** 2 + (threat.y - py) ** 2 < reach * reach:
+            away = math.degrees(math.atan2(py - threat.y, px - threat.x))
+            return game.InputCommand(aim_angle=away, thrust=True, fire=True)
+    return turret_pilot(sim, frame)
+
+
+PILOTS = {'bot': bot_pilot, 'turret': turret_pilot}
+
+
+def play(job):
+    """Run one headless game to death or max_frames and return its stats row."""
+    ship, start_wave, seed, pilot_name, max_frames = job
+    pilot = PILOTS[pilot_name]
+    sim = game.GameSimulation(seed=seed)
+    sim.unlock_ship(ship, equip=True)
+    sim.enemies.clear()
+    sim.wave = start_wave
+    sim.spawn_wave()
+    lives = sim.player.lives
+    damage = 0
+    frame = 0
+    while frame < max_frames and not sim.game_over:
+        sim.step(pilot(sim, frame))
+        if sim.player.lives < lives:
+            damage += lives - sim.player.lives
+        lives = sim.player.lives
+        frame += 1
+    return {
+        'ship': ship, 'start_wave': start_wave,
+        'boss_type': (start_wave // 4 - 1) % 3 if start_wave % 4 == 0 else '',
+        'seed': seed, 'pilot': pilot_name, 'frames': frame, 'survival_s': round(frame / game.FPS, 2),
+        'died': int(sim.game_over), 'waves_cleared': sim.wave - start_wave, 'final_wave': sim.wave,
+        'score': sim.score, 'coins': sim.coins, 'damage_taken': damage,
+    }
+
+
+def sweep(jobs, workers, chunksize=4):
+    if workers == 1:
+        return [play(job) for job in jobs]
+    # Spawned workers each import the game fresh, which starts no pygame or
+    # SDL, and are shut down with close()/join() once the jobs are drained
+    pool = multiprocessing.get_context('spawn').Pool(workers)
+    try:
+        return list(pool.imap_unordered(play, jobs, chunksize))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['ship'], row['start_wave']), []).append(row)
+    print(f"{'ship':<12} {'wave':>4} {'boss':>4} {'runs':>5} {'died':>6} {'surv s':>8} "
+          f"{'cleared':>8} {'score':>9} {'coins':>8} {'damage':>7}")
+    for (ship, wave), group in sorted(groups.items(), key=lambda g: (SHIPS.index(g[0][0]), g[0][1])):
+        n = len(group)
+        mean = lambda key: sum(r[key] for r in group) / n
+        print(f"{ship:<12} {wave:>4} {str(group[0]['boss_type']):>4} {n:>5} {100 * mean('died'):>5.0f}% "
+              f"{mean('survival_s'):>8.1f} {mean('waves_cleared'):>8.2f} {mean('score'):>9.0f} "
+              f"{mean('coins'):>8.0f} {mean('damage_taken'):>7.2f}")
+
+
+def parse_list(text):
+    return [int(v) for v in text.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ships', default=','.join(SHIPS), help='comma-separated ship ids')
+    parser.add_argument('--waves', type=parse_list, default=[1, 4, 5, 8, 9, 12, 13, 17],
+                        help='comma-separated starting waves')
+    parser.add_argument('--seeds', type=int, default=20, help='seeds per (ship, wave)')
+    parser.add_argument('--seed-base', type=int, default=0)
+    parser.add_argument('--pilot', choices=sorted(PILOTS), default='bot')
+    parser.add_argument('--max-seconds', type=float, default=120, help='game time cap per run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--out', metavar='PATH', help='write one CSV row per run')
+    args = parser.parse_args(argv)
+
+    ships = [s for s in args.ships.split(',') if s]
+    for ship in ships:
+        if ship not in SHIPS:
+            parser.error(f'unknown ship {ship!r}')
+    max_frames = int(args.max_seconds * game.FPS)
+    jobs = [(ship, wave, args.seed_base + seed, args.pilot, max_frames)
+            for ship in ships for wave in args.waves for seed in range(args.seeds)]
+
+    t0 = time.perf_counter()
+    rows = sweep(jobs, max(1, args.workers))
+    elapsed = time.perf_counter() - t0
+    frames = sum(r['frames'] for r in rows)
+
+    summarize(rows)
+    print(f"{len(rows)} runs, {frames} frames in {elapsed:.1f} s on {args.workers} workers: "
+          f"{len(rows) / elapsed:.1f} runs/s, {frames / elapsed:.0f} frames/s")
+    if args.out:
+        rows.sort(key=lambda r: (SHIPS.index(r['ship']), r['start_wave'], r['seed']))
+        with open(args.out, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""Scripted frame-cost benchmark for Geometric Asteroids.
+
+Runs named scenarios headless (SDL dummy video driver), timing every frame's
+GameSimulation.step() and GeometricAsteroids.draw() plus their phases, and
+reports p50/p99 milliseconds. It also times cold starts: launching the game
+in a fresh interpreter until it exits after its first frame, windowed and
+headless. Results can be saved as a baseline and later runs compared
+against it:
+
+    python benchmark.py --save bench_baseline.json
+    python benchmark.py --compare bench_baseline.json --threshold 15
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import geometric_asteroids as game
+
+import pygame
+
+
+def aim_at_nearest(sim, cmd):
+    px, py = sim.player.x, sim.player.y
+    if sim.horde is not None:
+        target = sim.horde.nearest(px, py)
+        if target:
+            cmd.aim_angle = math.degrees(math.atan2(target[1] - py, target[0] - px))
+        return cmd
+    targets = sim.enemies + ([sim.boss] if sim.boss else [])
+    if targets:
+        target = min(targets, key=lambda e: (e.x - px) ** 2 + (e.y - py) ** 2)
+        cmd.aim_angle = math.degrees(math.atan2(target.y - py, target.x - px))
+    return cmd
+
+
+def boss_wave(boss_type, boss_index=10):
+    # BossEnemy.type is (boss_index - 1) % 3; pick the index closest above boss_index
+    while (boss_index - 1) % 3 != boss_type:
+        boss_index += 1
+    return boss_index * 4
+
+
+class Scenario:
+    def __init__(self, name, ship='basic', wave=1, fire=False, each_frame=None):
+        self.name = name
+        self.ship = ship
+        self.wave = wave
+        self.fire = fire
+        self.each_frame = each_frame
+
+    def setup(self, sim):
+        sim.unlock_ship(self.ship, equip=True)
+        # Scenarios measure steady-state cost, so the player never dies
+        sim.player.lives = 10 ** 6
+        sim.enemies.clear()
+        sim.wave = self.wave
+        sim.spawn_wave()
+
+    def command(self, sim, frame):
+        if self.each_frame:
+            self.each_frame(sim, frame)
+        return aim_at_nearest(sim, game.InputCommand(fire=self.fire))
+
+
+class CapScenario(Scenario):
+    """A regular wave held at the full enemy cap."""
+    def __init__(self, name, wave, **kwargs):
+        super().__init__(name, wave=wave, each_frame=hold_cap, **kwargs)
+
+    def setup(self, sim):
+        super().setup(sim)
+        fill_to_cap(sim)
+        assert len(sim.enemies) == wave_cap(self.wave) == 30, len(sim.enemies)
+
+
+class HordeScenario(Scenario):
+    def __init__(self, name, target, ship='shotgun'):
+        super().__init__(name, ship=ship, fire=True)
+        self.target = target
+
+    def setup(self, sim):
+        sim.start_horde(self.target)
+        sim.unlock_ship(self.ship, equip=True)
+        sim.player.lives = 10 ** 6
+        # Start from a full horde rather than waiting for it to stream in
+        while len(sim.horde) < self.target:
+            sim.horde_threat = self.target
+            sim.spawn_horde()
+
+
+def hold_wave(sim, frame):
+    # Keep the wave populated instead of letting it clear and advance
+    if not sim.enemies and not sim.boss:
+        sim.spawn_wave()
+
+
+def wave_cap(wave):
+    # GameSimulation.spawn_wave's max_enemies
+    return min(6 + wave * 2, 30)
+
+
+def fill_to_cap(sim):
+    # The threat budget runs out before the cap (about 21 enemies at wave 21), so top up with more rolls
+    weights = sim.role_weights_for_wave(sim.wave)
+    roles = list(weights)
+    while len(sim.enemies) < wave_cap(sim.wave):
+        sim.enemies.append(sim.roll_enemy(3, roles, [weights[r] for r in roles])[0])
+
+
+def hold_cap(sim, frame):
+    hold_wave(sim, frame)
+    fill_to_cap(sim)
+
+
+def hold_boss(sim, frame):
+    # Respawn the scenario's boss if the player manages to kill it
+    if not sim.boss:
+        sim.wave -= 1
+        sim.spawn_wave()
+
+
+def projectile_storm(sim, frame):
+    # A high-index type-1 boss firing a volley every 4 frames keeps 300+ projectiles up
+    hold_boss(sim, frame)
+    if frame % 4 == 0:
+        sim.boss.attack_timer = 0
+
+
+def boss_death_burst(sim, frame):
+    # Kill a boss through the real collision path every 30 frames (one particle lifetime)
+    if frame % 30 == 0:
+        sim.wave = boss_wave(0)
+        sim.spawn_wave()
+        sim.boss.x, sim.boss.y = game.WIDTH // 2, game.HEIGHT // 4
+        sim.boss.health = 0.5
+        sim.bullets.append(sim.bullet_pool.acquire(sim.boss.x, sim.boss.y, 0, 0))
+
+
+SCENARIOS = [
+    Scenario('wave1', wave=1, each_frame=hold_wave),
+    # Wave 21 is a regular wave (20 is a boss wave) whose cap is the 30-enemy maximum
+    CapScenario('wave21_cap', 21),
+    Scenario('boss_type0', wave=boss_wave(0), fire=True, each_frame=hold_boss),
+    Scenario('boss_type1', wave=boss_wave(1), fire=True, each_frame=hold_boss),
+    Scenario('boss_type2', wave=boss_wave(2), fire=True, each_frame=hold_boss),
+    Scenario('shotgun_fire', ship='shotgun', wave=21, fire=True, each_frame=hold_wave),
+    Scenario('interceptor_fire', ship='interceptor', wave=21, fire=True, each_frame=hold_wave),
+    Scenario('boss_death_burst', each_frame=boss_death_burst),
+    Scenario('projectile_storm', wave=boss_wave(1, boss_index=40), each_frame=projectile_storm),
+    HordeScenario('horde2000', 2000),
+    HordeScenario('horde5000', 5000),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(math.floor(k)), int(math.ceil(k))
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples):
+    ms = [s * 1000 for s in samples]
+    return {'p50': percentile(ms, 50), 'p99': percentile(ms, 99), 'mean': sum(ms) / len(ms) if ms else 0.0}
+
+
+def run_scenario(scenario, view, frames, warmup, seed):
+    sim = game.GameSimulation(seed=seed)
+    view.sim = sim
+    view.full_redraw = True
+    scenario.setup(sim)
+    timer = game.PhaseTimer()
+    update_times, draw_times = [], []
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            timer.clear()
+            sim.phase_timer = view.phase_timer = timer
+        cmd = scenario.command(sim, frame)
+        t0 = time.perf_counter()
+        sim.step(cmd)
+        t1 = time.perf_counter()
+        view.draw()
+        t2 = time.perf_counter()
+        if frame >= warmup:
+            update_times.append(t1 - t0)
+            draw_times.append(t2 - t1)
+    sim.phase_timer = view.phase_timer = None
+    return {
+        'update': summarize(update_times),
+        'draw': summarize(draw_times),
+        'phases': {name: summarize(samples) for name, samples in sorted(timer.samples.items())},
+        'entities': {'enemies': len(sim.enemies), 'bullets': len(sim.bullets),
+                     'projectiles': len(sim.boss_projectiles), 'particles': len(sim.particles),
+                     'horde': len(sim.horde) if sim.horde is not None else 0},
+        'pools': {'bullets': sim.bullet_pool.stats(), 'powerups': sim.powerup_pool.stats()},
+    }
+
+
+# Extra command-line arguments for each cold-start measurement
+STARTUP = {'window': [], 'headless': ['--headless']}
+
+
+def cold_start(extra_args, runs):
+    # The launch goes through the CLI, so it pays for interpreter start, imports and teardown
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geometric_asteroids.py')
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, script, '--frames', '1'] + extra_args, check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def print_report(results, baseline=None):
+    for name, res in results.items():
+        base = baseline.get(name) if baseline else None
+        print(f"{name}  ({', '.join(f'{k}={v}' for k, v in res['entities'].items())})")
+        for pool, stats in res.get('pools', {}).items():
+            print(f"  pool {pool:<19} size {stats['size']:4}   high water {stats['high_water']:4}"
+                  f"   reused {stats['reused']}")
+        rows = [('update', res['update']), ('draw', res['draw'])]
+        rows += [('  ' + phase, stats) for phase, stats in res['phases'].items()]
+        for label, stats in rows:
+            line = f"  {label:<24} p50 {stats['p50']:8.3f} ms   p99 {stats['p99']:8.3f} ms"
+            key = label.strip()
+            ref = None
+            if base:
+                ref = base.get(key) or base['phases'].get(key)
+            if ref and ref['p50'] > 0:
+                line += f"   p50 {100 * (stats['p50'] / ref['p50'] - 1):+6.1f}%"
+            print(line)
+
+
+def print_startup(startup, baseline=None):
+    print("startup  (fresh interpreter to exit after the first frame)")
+    for name, stats in startup.items():
+        line = f"  {name:<24} p50 {stats['p50']:8.3f} ms   p99 {stats['p99']:8.3f} ms"
+        ref = baseline.get(name) if baseline else None
+        if ref and ref['p50'] > 0:
+            line += f"   p50 {100 * (stats['p50'] / ref['p50'] - 1):+6.1f}%"
+        print(line)
+
+
+def regressions(results, baseline, threshold, startup=None, startup_baseline=None):
+    found = []
+    for name, stats in (startup or {}).items():
+        ref = (startup_baseline or {}).get(name)
+        if ref and ref['p50'] > 0 and stats['p50'] > ref['p50'] * (1 + threshold / 100):
+            found.append(f"startup.{name} p50 {ref['p50']:.3f} -> {stats['p50']:.3f} ms")
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ('update', 'draw'):
+            ref = base[key]['p50']
+            if ref > 0 and res[key]['p50'] > ref * (1 + threshold / 100):
+                found.append(f"{name}.{key} p50 {ref:.3f} -> {res[key]['p50']:.3f} ms")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600, help='measured frames per scenario')
+    parser.add_argument('--warmup', type=int, default=60, help='unmeasured frames before each scenario')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help='run only this scenario (repeatable)')
+    parser.add_argument('--dirty-rects', action='store_true', help='render with the dirty-rectangle mode')
+    parser.add_argument('--startup-runs', type=int, default=5, help='cold starts to time per mode (0 to skip)')
+    parser.add_argument('--save', metavar='PATH', help='write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='p50 slowdown (percent) that counts as a regression with --compare')
+    args = parser.parse_args(argv)
+
+    view = game.GeometricAsteroids()
+    view.dirty_rects = args.dirty_rects
+    results = {}
+    for scenario in SCENARIOS:
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        results[scenario.name] = run_scenario(scenario, view, args.frames, args.warmup, args.seed)
+    startup = {name: cold_start(extra, args.startup_runs) for name, extra in STARTUP.items()} \
+        if args.startup_runs > 0 else {}
+
+    baseline = startup_baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline, startup_baseline = saved['scenarios'], saved.get('startup')
+    print_report(results, baseline)
+    if startup:
+        print_startup(startup, startup_baseline)
+
+    if args.save:
+        meta = {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                'machine': platform.machine(), 'frames': args.frames, 'seed': args.seed,
+                'dirty_rects': args.dirty_rects}
+        with open(args.save, 'w') as f:
+            json.dump({'meta': meta, 'scenarios': results, 'startup': startup}, f, indent=2)
+    if baseline:
+        found = regressions(results, baseline, args.threshold, startup, startup_baseline)
+        for line in found:
+            print('REGRESSION', line)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
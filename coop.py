@@ -0,0 +1,705 @@
+"""Localhost co-op for Geometric Asteroids over UDP.
+
+A server process runs the only GameSimulation, with one ship per client (two
+to four). Clients send their InputCommands and draw the quantized,
+delta-compressed state snapshots the server sends back, predicting their own
+ship in between. Every socket can sit behind an artificial latency, jitter
+and packet loss shim for testing:
+
+    python coop.py server --players 2
+    python coop.py client --ship tank --latency 40 --loss 0.02
+    python coop.py bench --players 4 --latency 40 --jitter 10 --loss 0.05
+
+`bench` runs a server and bot clients on localhost and reports per-client
+bandwidth, server tick time and prediction error.
+"""
+import argparse
+import heapq
+import math
+import multiprocessing
+import random
+import socket
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from itertools import chain
+
+import numpy as np
+
+import geometric_asteroids as game
+
+# Packet types and layouts
+HELLO, WELCOME, INPUT, SNAPSHOT = 1, 2, 3, 4
+HELLO_FORMAT = struct.Struct('<BB')        # type, ship code
+WELCOME_FORMAT = struct.Struct('<BBQ')     # type, seat, seed
+INPUT_FORMAT = struct.Struct('<BBIIB')     # type, seat, acked snapshot tick, newest input seq, command count
+SNAPSHOT_FORMAT = struct.Struct('<BIII')   # type, tick, baseline tick (0 = full), last input seq applied
+# Every input packet repeats the newest commands, so one lost packet costs nothing
+INPUT_REDUNDANCY = 6
+# Inputs queued on the server beyond this are dropped, so a stall doesn't turn into lasting lag
+MAX_BACKLOG = 3
+# Snapshots each side keeps as delta baselines
+BASELINES = 32
+
+# Quantization: positions to 1/8 px, velocities to 1/256 px per step,
+# angles to 1/64 degree, everything stored as int16
+POS_SCALE, VEL_SCALE, ANGLE_SCALE = 8, 256, 64
+KINDS = {
+    'players': ('x', 'y', 'angle', 'vel_x', 'vel_y', 'lives', 'invulnerable', 'weapon_timer', 'weapon', 'ship'),
+    'enemies': ('x', 'y', 'angle', 'size', 'sides', 'role', 'overlay'),
+    'boss': ('x', 'y', 'angle', 'health_permille', 'boss_index'),
+    'bullets': ('x', 'y', 'radius', 'owner'),
+    'powerups': ('x', 'y', 'lifetime', 'type'),
+}
+OVERLAYS = (None, 'dash', 'shield')
+# score, coins, wave, wave timer, flags, owned ships (bit per SHIP_TYPES entry)
+HEADER = struct.Struct('<qqiiBB')
+
+
+class LossyLink:
+    """Non-blocking UDP socket that delays, jitters and drops what it sends.
+
+    Delayed packets sit in a heap until flush() finds them due; receive()
+    flushes first, so calling it once per frame keeps the link moving.
+    """
+    def __init__(self, sock, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        sock.setblocking(False)
+        self.sock = sock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []
+        self.queued = 0
+        self.dropped = 0
+
+    def send(self, data, addr):
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        heapq.heappush(self.queue, (time.perf_counter() + delay, self.queued, data, addr))
+        self.queued += 1
+        self.flush()
+
+    def flush(self):
+        now = time.perf_counter()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, addr = heapq.heappop(self.queue)
+            try:
+                self.sock.sendto(data, addr)
+            except OSError:
+                # The peer went away; UDP has nobody to tell
+                pass
+
+    def receive(self):
+        self.flush()
+        packets = []
+        while True:
+            try:
+                packets.append(self.sock.recvfrom(65536))
+            except (BlockingIOError, InterruptedError):
+                return packets
+            except ConnectionResetError:
+                continue
+
+    def wait_until(self, deadline):
+        # Sleep in short slices so delayed packets still go out on time
+        while True:
+            self.flush()
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                return
+            time.sleep(min(left, 0.001))
+
+
+def open_link(args, port=0):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', port))
+    return LossyLink(sock, args.latency / 1000, args.jitter / 1000, args.loss, args.link_seed)
+
+
+class NetIds:
+    """Ids that stay with the same server object from tick to tick, so a
+    delta lines up with that entity's row in the baseline."""
+    def __init__(self):
+        self.ids = {}
+        self.next_id = 1
+
+    def assign(self, objs):
+        old, new = self.ids, {}
+        out = []
+        for obj in objs:
+            key = id(obj)
+            net_id = old.get(key)
+            if net_id is None:
+                net_id = self.next_id
+                self.next_id += 1
+            new[key] = net_id
+            out.append(net_id)
+        self.ids = new
+        return np.array(out, dtype=np.uint32)
+
+
+def quantize(rows, kind):
+    values = np.rint(np.array(rows, dtype=float).reshape(-1, len(KINDS[kind])))
+    return np.clip(values, -32768, 32767).astype(np.int16)
+
+
+def capture(sim, net_ids):
+    """Quantize the world into (header, {kind: (ids, int16 rows)})."""
+    P, V, A = POS_SCALE, VEL_SCALE, ANGLE_SCALE
+    players = sim.players
+    boss = sim.boss
+    bullets = list(chain(sim.bullets, sim.boss_projectiles))
+    flags = (1 if sim.wave_complete else 0) | (2 if sim.game_over else 0) | (4 if sim.shop_open else 0)
+    owned = sum(1 << game.SHIP_TYPES.index(ship) for ship in sim.owned_ships)
+    rows = {
+        'players': [(p.x * P, p.y * P, p.angle % 360 * A, p.vel_x * V, p.vel_y * V, p.lives, p.invulnerable,
+                     p.weapon_timer, sim.WEAPON_TYPES.index(p.weapon_type), game.SHIP_TYPES.index(p.ship_type))
+                    for p in players],
+        'enemies': [(e.x * P, e.y * P, e.angle % 360 * A, e.size, e.sides, e.role_code,
+                     OVERLAYS.index(e.overlay_state())) for e in sim.enemies],
+        'boss': [(boss.x * P, boss.y * P, boss.angle % 360 * A, 1000 * max(0, boss.health) / boss.max_health,
+                  boss.boss_index)] if boss else [],
+        'bullets': [(b.x * P, b.y * P, b.radius, 0 if b.owner == 'player' else 1) for b in bullets],
+        'powerups': [(u.x * P, u.y * P, u.lifetime, sim.POWERUP_TYPES.index(u.type)) for u in sim.powerups],
+    }
+    ids = {
+        'players': np.arange(len(players), dtype=np.uint32),
+        'enemies': net_ids['enemies'].assign(sim.enemies),
+        'boss': np.array([boss.boss_index] if boss else [], dtype=np.uint32),
+        'bullets': net_ids['bullets'].assign(bullets),
+        'powerups': net_ids['powerups'].assign(sim.powerups),
+    }
+    header = (sim.score, sim.coins, sim.wave, sim.wave_timer, flags, owned)
+    return header, {kind: (ids[kind], quantize(rows[kind], kind)) for kind in KINDS}
+
+
+def aligned(base, ids):
+    """Rows of `base` (ids, values) matching `ids`; zeros for ids it doesn't have."""
+    base_ids, base_values = base
+    out = np.zeros((len(ids), base_values.shape[1]), dtype=np.int16)
+    if len(base_ids) and len(ids):
+        order = np.argsort(base_ids)
+        sorted_ids = base_ids[order]
+        pos = np.searchsorted(sorted_ids, ids).clip(max=len(sorted_ids) - 1)
+        hit = sorted_ids[pos] == ids
+        out[hit] = base_values[order[pos[hit]]]
+    return out
+
+
+def encode(state, base=None):
+    """Compressed bytes for `state`; against `base`, a state the client already
+    holds, each entity only carries its change since then."""
+    header, kinds = state
+    parts = [HEADER.pack(*header)]
+    for kind in KINDS:
+        ids, values = kinds[kind]
+        if base is not None:
+            values = values - aligned(base[1][kind], ids)
+        # Ids as gaps and values column by column: both are mostly runs of small numbers
+        parts.append(struct.pack('<H', len(ids)))
+        parts.append(np.diff(ids, prepend=np.uint32(0)).astype(np.uint32).tobytes())
+        parts.append(values.T.tobytes())
+    return zlib.compress(b''.join(parts), 6)
+
+
+def decode(blob, base=None):
+    data = zlib.decompress(blob)
+    header = HEADER.unpack_from(data)
+    offset = HEADER.size
+    kinds = {}
+    for kind, columns in KINDS.items():
+        (n,) = struct.unpack_from('<H', data, offset)
+        offset += 2
+        ids = np.cumsum(np.frombuffer(data, np.uint32, n, offset), dtype=np.uint32)
+        offset += 4 * n
+        values = np.frombuffer(data, np.int16, n * len(columns), offset).reshape(len(columns), n).T.copy()
+        offset += 2 * n * len(columns)
+        if base is not None:
+            values += aligned(base[1][kind], ids)
+        kinds[kind] = (ids, values)
+    return header, kinds
+
+
+class ClientSeat:
+    """Server-side record of one client: its ship, queued inputs and traffic."""
+    def __init__(self, seat, addr):
+        self.seat = seat
+        self.addr = addr
+        self.pending = {}  # input seq -> packed InputCommand
+        self.applied = 0
+        self.held = game.InputCommand()
+        self.ack = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+
+
+class CoopServer:
+    """Authoritative simulation: steps once per tick with one command per seat
+    and sends every client a snapshot delta-encoded against the last one it
+    acknowledged (a full snapshot when that is too old)."""
+    def __init__(self, link, sim, players=2, snapshot_every=1, lives=None):
+        self.link = link
+        self.sim = sim
+        self.players = players
+        self.snapshot_every = snapshot_every
+        self.lives = lives
+        self.seats = []
+        self.by_addr = {}
+        self.tick = 0
+        self.history = {}
+        self.net_ids = {kind: NetIds() for kind in ('enemies', 'bullets', 'powerups')}
+        self.step_times, self.snapshot_times = [], []
+
+    def handle(self, packets):
+        for data, addr in packets:
+            if not data:
+                continue
+            kind = data[0]
+            if kind == HELLO and len(data) >= HELLO_FORMAT.size:
+                self.join(addr, game.SHIP_TYPES[data[1] % len(game.SHIP_TYPES)])
+            elif kind == INPUT and addr in self.by_addr and len(data) >= INPUT_FORMAT.size:
+                seat = self.by_addr[addr]
+                _, _, ack, newest, count = INPUT_FORMAT.unpack_from(data)
+                size = game.InputCommand.FORMAT.size
+                if count > (len(data) - INPUT_FORMAT.size) // size:
+                    # Shorter than the commands it claims: malformed or truncated
+                    continue
+                seat.bytes_in += len(data)
+                seat.ack = max(seat.ack, ack)
+                for i in range(count):
+                    seq = newest - count + 1 + i
+                    if seq > seat.applied:
+                        seat.pending[seq] = data[INPUT_FORMAT.size + i * size:INPUT_FORMAT.size + (i + 1) * size]
+
+    def join(self, addr, ship):
+        seat = self.by_addr.get(addr)
+        if seat is None:
+            if len(self.seats) >= self.players:
+                return
+            sim = self.sim
+            if not self.seats:
+                sim.unlock_ship(ship, equip=True)
+                sim.place_players()
+            else:
+                sim.add_player(ship)
+            seat = ClientSeat(len(self.seats), addr)
+            self.seats.append(seat)
+            self.by_addr[addr] = seat
+            if self.lives:
+                sim.players[seat.seat].lives = self.lives
+        # Repeated for a HELLO whose WELCOME got lost
+        self.link.send(WELCOME_FORMAT.pack(WELCOME, seat.seat, self.sim.seed), addr)
+
+    def next_command(self, seat):
+        pending = seat.pending
+        while len(pending) > MAX_BACKLOG:
+            seat.applied = min(pending)
+            del pending[seat.applied]
+        # A seq lost for good (every redundant copy dropped) is skipped
+        if pending and seat.applied + 1 not in pending and min(pending) > seat.applied + 1:
+            seat.applied = min(pending) - 1
+        packed = pending.pop(seat.applied + 1, None)
+        if packed is None:
+            # Nothing arrived in time: keep the held controls, without one-shot actions
+            held = seat.held
+            return game.InputCommand(held.aim_angle, held.rotate, held.thrust, held.fire)
+        seat.applied += 1
+        cmd = seat.held = game.InputCommand.unpack(packed)
+        # Horde mode isn't replicated
+        cmd.horde = False
+        return cmd
+
+    def step(self):
+        cmds = [self.next_command(seat) for seat in self.seats]
+        restart = self.sim.game_over and cmds and cmds[0].restart
+        t0 = time.perf_counter()
+        self.sim.step(cmds)
+        self.step_times.append(time.perf_counter() - t0)
+        if restart and self.lives:
+            # A restart brings every ship back with the default lives
+            for player in self.sim.players:
+                player.lives = self.lives
+        self.tick += 1
+        if self.tick % self.snapshot_every == 0:
+            self.send_snapshots()
+
+    def send_snapshots(self):
+        t0 = time.perf_counter()
+        state = self.history[self.tick] = capture(self.sim, self.net_ids)
+        for tick in [t for t in self.history if t <= self.tick - BASELINES * self.snapshot_every]:
+            del self.history[tick]
+        encoded = {}
+        for seat in self.seats:
+            base_tick = seat.ack if seat.ack in self.history else 0
+            blob = encoded.get(base_tick)
+            if blob is None:
+                blob = encoded[base_tick] = encode(state, self.history[base_tick] if base_tick else None)
+            packet = SNAPSHOT_FORMAT.pack(SNAPSHOT, self.tick, base_tick, seat.applied) + blob
+            self.link.send(packet, seat.addr)
+            seat.bytes_out += len(packet)
+            seat.snapshots += 1
+            seat.full_snapshots += not base_tick
+        self.snapshot_times.append(time.perf_counter() - t0)
+
+    def serve(self, seconds=None, log=print):
+        log(f"waiting for {self.players} players on {self.link.sock.getsockname()}")
+        while len(self.seats) < self.players:
+            self.handle(self.link.receive())
+            time.sleep(0.005)
+        log("all players in, starting")
+        step_time = 1 / game.FPS
+        start = next_tick = time.perf_counter()
+        try:
+            while seconds is None or time.perf_counter() - start < seconds:
+                self.handle(self.link.receive())
+                self.step()
+                next_tick += step_time
+                # After a long stall, resynchronize instead of fast-forwarding
+                if time.perf_counter() - next_tick > 5 * step_time:
+                    next_tick = time.perf_counter()
+                self.link.wait_until(next_tick)
+        except KeyboardInterrupt:
+            pass
+        return time.perf_counter() - start
+
+    def report(self, elapsed):
+        ms = lambda values, pct: 1000 * float(np.percentile(values, pct)) if values else 0.0
+        lines = [f"server: {self.tick} ticks in {elapsed:.1f} s, {len(self.sim.enemies)} enemies, "
+                 f"{len(self.sim.bullets) + len(self.sim.boss_projectiles)} projectiles at the end",
+                 f"  step      p50 {ms(self.step_times, 50):7.3f} ms   p99 {ms(self.step_times, 99):7.3f} ms",
+                 f"  snapshots p50 {ms(self.snapshot_times, 50):7.3f} ms   p99 {ms(self.snapshot_times, 99):7.3f} ms"
+                 f"   (capture + encode for every client)"]
+        for seat in self.seats:
+            lines.append(f"  seat {seat.seat}: down {seat.bytes_out / elapsed / 1024:6.1f} KiB/s "
+                         f"({seat.bytes_out / max(1, seat.snapshots):6.0f} B/snapshot, "
+                         f"{seat.full_snapshots} full of {seat.snapshots})   "
+                         f"up {seat.bytes_in / elapsed / 1024:5.1f} KiB/s")
+        return '\n'.join(lines)
+
+
+class CoopClient:
+    """A client's view of the game: a mirror GameSimulation rebuilt from
+    snapshots, with its own ship predicted from inputs the server hasn't
+    acknowledged yet. The mirror is only drawn, never stepped."""
+    def __init__(self, link, server, ship='basic'):
+        self.link = link
+        self.server = server
+        self.ship = ship
+        self.seat = None
+        self.sim = None
+        self.seq = 0
+        self.pending = deque()  # (seq, packed command, time sent) not yet applied by the server
+        self.predicted = {}     # seq -> predicted (x, y) of our ship after that command
+        self.states = {}        # snapshot tick -> decoded state, kept as delta baselines
+        self.tick = 0
+        self.boss = None
+        self.last_enemies = {}
+        self.bytes_in = 0
+        self.snapshots = 0
+        self.missing_baseline = 0
+        self.errors = []
+        self.round_trips = []
+        self.decode_times = []
+
+    def connect(self, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        hello = HELLO_FORMAT.pack(HELLO, game.SHIP_TYPES.index(self.ship))
+        while time.perf_counter() < deadline:
+            self.link.send(hello, self.server)
+            retry = time.perf_counter() + 0.2
+            while time.perf_counter() < retry:
+                for data, _ in self.link.receive():
+                    if data and data[0] == WELCOME and len(data) >= WELCOME_FORMAT.size:
+                        _, self.seat, seed = WELCOME_FORMAT.unpack_from(data)
+                        self.sim = game.GameSimulation(self.ship, seed=seed)
+                        self.sim.enemies.clear()
+                        return True
+                time.sleep(0.005)
+        return False
+
+    def send_input(self, cmd):
+        """Send this frame's command (with the last few for redundancy) and predict our ship."""
+        self.seq += 1
+        packed = cmd.pack()
+        self.pending.append((self.seq, packed, time.perf_counter()))
+        # Without acknowledgements for this long the server is gone; don't grow forever
+        if len(self.pending) > 2 * game.FPS:
+            self.pending.popleft()
+        recent = list(self.pending)[-INPUT_REDUNDANCY:]
+        self.link.send(INPUT_FORMAT.pack(INPUT, self.seat, self.tick, self.seq, len(recent)) +
+                       b''.join(p for _, p, _ in recent), self.server)
+        self.predict(game.InputCommand.unpack(packed))
+        self.predicted[self.seq] = (self.sim.player.x, self.sim.player.y)
+
+    def predict(self, cmd):
+        # The same ship rules GameSimulation.step() applies, for our ship only
+        sim = self.sim
+        player = sim.player
+        if sim.shop_open or sim.game_over or player.lives <= 0:
+            return
+        sim.steer_player(player, cmd)
+        player.update()
+
+    def poll(self):
+        """Apply the newest snapshot that arrived, then replay unacknowledged inputs."""
+        newest = None
+        for data, _ in self.link.receive():
+            if not data or data[0] != SNAPSHOT or len(data) < SNAPSHOT_FORMAT.size:
+                continue
+            self.bytes_in += len(data)
+            _, tick, base_tick, applied = SNAPSHOT_FORMAT.unpack_from(data)
+            base = self.states.get(base_tick) if base_tick else None
+            if base_tick and base is None:
+                self.missing_baseline += 1
+                continue
+            t0 = time.perf_counter()
+            self.states[tick] = decode(data[SNAPSHOT_FORMAT.size:], base)
+            self.decode_times.append(time.perf_counter() - t0)
+            self.snapshots += 1
+            if tick > self.tick and (newest is None or tick > newest[0]):
+                newest = (tick, applied)
+        if newest is None:
+            return False
+        tick, applied = newest
+        self.tick = tick
+        for old in [t for t in self.states if t < tick - 2 * BASELINES]:
+            del self.states[old]
+        self.apply(self.states[tick])
+        player = self.sim.player
+        guess = self.predicted.get(applied)
+        if guess is not None:
+            self.errors.append(math.hypot(guess[0] - player.x, guess[1] - player.y))
+        while self.pending and self.pending[0][0] <= applied:
+            seq, _, sent = self.pending.popleft()
+            if seq == applied:
+                self.round_trips.append(time.perf_counter() - sent)
+        for seq in [s for s in self.predicted if s <= applied]:
+            del self.predicted[seq]
+        for seq, packed, _ in self.pending:
+            self.predict(game.InputCommand.unpack(packed))
+            self.predicted[seq] = (player.x, player.y)
+        return True
+
+    def apply(self, state):
+        """Rebuild the mirror simulation's entities from a decoded snapshot."""
+        sim = self.sim
+        (sim.score, sim.coins, sim.wave, sim.wave_timer, flags, owned), kinds = state
+        sim.wave_complete, sim.game_over, sim.shop_open = bool(flags & 1), bool(flags & 2), bool(flags & 4)
+        sim.owned_ships = [ship for i, ship in enumerate(game.SHIP_TYPES) if owned >> i & 1]
+        P, V, A = POS_SCALE, VEL_SCALE, ANGLE_SCALE
+
+        players = sim.players
+        ships = []
+        for i, (x, y, angle, vel_x, vel_y, lives, invulnerable, weapon_timer, weapon, ship) in \
+                enumerate(kinds['players'][1].tolist()):
+            p = next((p for p in players if getattr(p, 'seat', None) == i), None)
+            if p is None or p.ship_type != game.SHIP_TYPES[ship]:
+                p = game.Player(game.SHIP_TYPES[ship])
+                p.seat = i
+            p.x, p.y, p.angle, p.vel_x, p.vel_y = x / P, y / P, angle / A, vel_x / V, vel_y / V
+            p.lives, p.invulnerable, p.weapon_timer = lives, invulnerable, weapon_timer
+            p.weapon_type = sim.WEAPON_TYPES[weapon]
+            ships.append(p)
+        if self.seat < len(ships):
+            sim.player = ships[self.seat]
+            sim.coop_players = ships[:self.seat] + ships[self.seat + 1:]
+
+        enemies, seen = [], {}
+        ids, values = kinds['enemies']
+        for net_id, (x, y, angle, size, sides, role, overlay) in zip(ids.tolist(), values.tolist()):
+            e = game.GeometricEnemy.__new__(game.GeometricEnemy)
+            e.x, e.y, e.angle, e.size, e.sides, e.role_code = x / P, y / P, angle / A, size, sides, role
+            e.shape_type = sim.SHAPE_TYPES[sides - 3]
+            e.color = game.GeometricEnemy.SHAPES[e.shape_type][1]
+            e.is_dashing, e.shield_active = OVERLAYS[overlay] == 'dash', OVERLAYS[overlay] == 'shield'
+            enemies.append(e)
+            seen[net_id] = e
+        # Particles aren't sent; enemies that vanished get their burst here
+        for net_id, e in self.last_enemies.items():
+            if net_id not in seen:
+                sim.particles.emit(e.x, e.y, e.color, 8)
+        sim.enemies, self.last_enemies = enemies, seen
+
+        sim.boss = None
+        for x, y, angle, permille, boss_index in kinds['boss'][1].tolist():
+            if self.boss is None or self.boss.boss_index != boss_index:
+                self.boss = game.BossEnemy(x / P, y / P, boss_index, rng=random.Random(boss_index))
+            boss = sim.boss = self.boss
+            boss.x, boss.y, boss.angle = x / P, y / P, angle / A
+            boss.health = permille * boss.max_health / 1000
+
+        sim.bullets, sim.boss_projectiles = [], []
+        for x, y, radius, owner in kinds['bullets'][1].tolist():
+            bullet = game.Bullet(x / P, y / P, 0, 0, 'boss' if owner else 'player')
+            bullet.radius = radius
+            (sim.boss_projectiles if owner else sim.bullets).append(bullet)
+
+        sim.powerups = []
+        for x, y, lifetime, kind in kinds['powerups'][1].tolist():
+            powerup = game.PowerUp(x / P, y / P, sim.POWERUP_TYPES[kind])
+            powerup.lifetime = lifetime
+            sim.powerups.append(powerup)
+
+    def report(self, elapsed):
+        ms = lambda values, pct: 1000 * float(np.percentile(values, pct)) if values else 0.0
+        errors = self.errors or [0.0]
+        return (f"client seat {self.seat}: {self.snapshots} snapshots, {self.missing_baseline} without a baseline, "
+                f"down {self.bytes_in / elapsed / 1024:.1f} KiB/s | input round trip p50 "
+                f"{ms(self.round_trips, 50):.1f} ms | prediction error mean {np.mean(errors):.2f} px, "
+                f"p99 {np.percentile(errors, 99):.2f} px | decode p50 {ms(self.decode_times, 50):.3f} ms")
+
+
+def bot_command(sim, rng):
+    # Aim and fire at the nearest target, thrusting now and then
+    player = sim.player
+    cmd = game.InputCommand(fire=True, thrust=rng.random() < 0.3, restart=sim.game_over)
+    targets = sim.enemies + ([sim.boss] if sim.boss else [])
+    if targets:
+        target = min(targets, key=lambda e: (e.x - player.x) ** 2 + (e.y - player.y) ** 2)
+        cmd.aim_angle = math.degrees(math.atan2(target.y - player.y, target.x - player.x))
+    return cmd
+
+
+def run_bot(client, seconds, seed):
+    """Play headless with bot_command() for `seconds`; returns the elapsed time."""
+    rng = random.Random(seed)
+    step_time = 1 / game.FPS
+    start = next_frame = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.poll()
+        client.send_input(bot_command(client.sim, rng))
+        next_frame += step_time
+        client.link.wait_until(next_frame)
+    return time.perf_counter() - start
+
+
+def play(client):
+    """Windowed client: live input in, mirror simulation drawn by the normal view."""
+    pygame = game.pygame
+    view = game.GeometricAsteroids(client.sim)
+    # Debug keys and rewind act on a local simulation, which a client doesn't have
+    view.debug_mode = False
+    view.rewind_enabled = False
+    sim = client.sim
+    running = True
+    while running:
+        frame_start = time.perf_counter()
+        cmd = game.InputCommand()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and sim.game_over:
+                cmd.restart = True
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and sim.shop_open:
+                for rect, item in view.shop_rects:
+                    if rect.collidepoint(event.pos):
+                        cmd.shop_pick = sim.shop_items.index(item)
+                        break
+        if not sim.game_over:
+            view.read_input(cmd)
+        client.send_input(cmd)
+        client.poll()
+        sim.particles.update()
+        if sim.game_over:
+            view.draw_game_over()
+        else:
+            view.draw()
+        view.update_quality((time.perf_counter() - frame_start) * 1000)
+        view.clock.tick(game.FPS)
+    pygame.quit()
+
+
+def bench_client(server, ship, seconds, link_args, seed, results):
+    link = LossyLink(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), *link_args, seed=seed)
+    link.sock.bind(('127.0.0.1', 0))
+    client = CoopClient(link, server, ship)
+    if not client.connect():
+        results.put(f"client {seed}: no answer from {server}")
+        return
+    results.put(client.report(run_bot(client, seconds, seed)))
+
+
+def new_simulation(args):
+    sim = game.GameSimulation(seed=args.seed)
+    if args.wave > 1:
+        sim.enemies.clear()
+        sim.wave = args.wave
+        sim.spawn_wave()
+    return sim
+
+
+def bench(args):
+    link = open_link(args)
+    server = CoopServer(link, new_simulation(args), args.players, args.snapshot_every, lives=args.lives)
+    addr = link.sock.getsockname()
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    link_args = (args.latency / 1000, args.jitter / 1000, args.loss)
+    ships = game.SHIP_TYPES
+    # Clients play a little longer than the server, so none of them stops first
+    workers = [ctx.Process(target=bench_client, args=(addr, ships[i % len(ships)], args.seconds + 2, link_args,
+                                                      i + 1, results))
+               for i in range(args.players)]
+    for worker in workers:
+        worker.start()
+    elapsed = server.serve(args.seconds, log=lambda line: None)
+    reports = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join()
+    print(f"{args.players} players from wave {args.wave}, latency {args.latency:g} ms +-{args.jitter:g}, loss {100 * args.loss:g}% "
+          f"each way, snapshot every {args.snapshot_every} tick(s)")
+    print(server.report(elapsed))
+    for line in sorted(reports):
+        print('  ' + line)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('server', 'client', 'bench'))
+    parser.add_argument('--host', default='127.0.0.1', help='server address (client)')
+    parser.add_argument('--port', type=int, default=5555)
+    parser.add_argument('--players', type=int, default=2, choices=range(2, game.MAX_PLAYERS + 1),
+                        help='clients the server waits for')
+    parser.add_argument('--ship', default='basic', choices=game.SHIP_TYPES)
+    parser.add_argument('--seed', type=int, help='game seed (server)')
+    parser.add_argument('--wave', type=int, default=1, help='starting wave (server)')
+    parser.add_argument('--lives', type=int, help='starting lives per ship (server)')
+    parser.add_argument('--snapshot-every', type=int, default=1, help='ticks between snapshots (server)')
+    parser.add_argument('--seconds', type=float, default=20, help='bench length')
+    parser.add_argument('--bot', action='store_true', help='play the client with the bench bot, headless')
+    parser.add_argument('--latency', type=float, default=0, help='added one-way delay in ms on sent packets')
+    parser.add_argument('--jitter', type=float, default=0, help='random +- ms on top of --latency')
+    parser.add_argument('--loss', type=float, default=0, help='fraction of sent packets dropped')
+    parser.add_argument('--link-seed', type=int, help='seed for the latency/loss shim')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'bench':
+        if args.lives is None:
+            args.lives = 99
+        return bench(args)
+    if args.mode == 'server':
+        server = CoopServer(open_link(args, args.port), new_simulation(args), args.players, args.snapshot_every,
+                            lives=args.lives)
+        print(server.report(server.serve()))
+        return 0
+    client = CoopClient(open_link(args), (args.host, args.port), args.ship)
+    if not client.connect():
+        print(f"no answer from {args.host}:{args.port}")
+        return 1
+    if args.bot:
+        print(client.report(run_bot(client, args.seconds, args.link_seed)))
+    else:
+        play(client)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
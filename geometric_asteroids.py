@@ -0,0 +1,3334 @@
+"""Geometric Asteroids: the game simulation, its pygame view and a command line.
+
+Importing the module has no side effects. pygame itself is only loaded the
+first time something touches it (a GeometricAsteroids window, a sprite),
+and the window initializes just the display and font subsystems, so
+headless simulations start quickly:
+
+    python geometric_asteroids.py --ship shotgun --wave 5
+    python geometric_asteroids.py --headless --seed 7 --frames 3600 --profile run.csv
+"""
+import argparse
+import importlib.util
+import random
+import math
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+def _lazy_import(name):
+    # The importlib LazyLoader recipe: the module body runs on first attribute access
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+pygame = _lazy_import('pygame')
+
+WIDTH = 900
+HEIGHT = 700
+FPS = 60
+# Largest distance anything moves in one step; a bigger jump between steps
+# means it wrapped around the screen (or a pooled object was reused)
+MAX_STEP_MOVE = 60
+# Steps of history the game-over kill cam replays
+KILL_CAM_FRAMES = 3 * FPS
+SHIP_TYPES = ('basic', 'interceptor', 'tank', 'shotgun', 'sniper')
+# Ships in one co-op game
+MAX_PLAYERS = 4
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+CYAN = (0, 255, 255)
+MAGENTA = (255, 0, 255)
+YELLOW = (255, 255, 0)
+GREEN = (0, 255, 100)
+ORANGE = (255, 165, 0)
+PURPLE = (200, 50, 255)
+RED = (255, 50, 50)
+BLUE = (50, 150, 255)
+GRAY = (150, 150, 150)
+
+# Phase-name prefixes stacked in the profiler graph, bottom to top
+PROFILER_GROUPS = (('input', CYAN), ('update', GREEN), ('collide', ORANGE), ('draw', MAGENTA))
+
+class Player:
+    def __init__(self, ship_type='basic'):
+        self.x = WIDTH // 2
+        self.y = HEIGHT // 2
+        # Position before the last update(), for swept collision tests
+        self.prev_x, self.prev_y = self.x, self.y
+        self.angle = 0
+        self.vel_x = 0
+        self.vel_y = 0
+        self.ship_type = ship_type
+        self.setup_ship_stats()
+        self.shoot_cooldown = 0
+        self.lives = 3
+        self.invulnerable = 0
+        self.weapon_type = 'normal'
+        self.weapon_timer = 0
+    
+    def setup_ship_stats(self):
+        ships = {
+            'basic': {
+                'name': 'Fighter', 'color': CYAN, 'accel': 0.3, 'friction': 0.98, 
+                'max_speed': 7, 'damage': 1, 'shoot_delay': 13, 'ability': None
+            },
+            'interceptor': {
+                'name': 'Interceptor', 'color': GREEN, 'accel': 0.4, 'friction': 0.97,
+                'max_speed': 15, 'damage': .75, 'shoot_delay': 4, 'ability': 'rapid'
+            },
+            'tank': {
+                'name': 'Tank', 'color': ORANGE, 'accel': 0.25, 'friction': 0.99,
+                'max_speed': 3, 'damage': 5, 'shoot_delay': 22, 'ability': 'heavy'
+            },
+            'shotgun': {
+                'name': 'Shotgun', 'color': RED, 'accel': 0.3, 'friction': 0.98,
+                'max_speed': 8, 'damage': 1, 'shoot_delay': 17, 'ability': 'spread'
+            },
+            'sniper': {
+                'name': 'Sniper', 'color': PURPLE, 'accel': 0.32, 'friction': 0.98,
+                'max_speed': 6, 'damage': 10, 'shoot_delay': 40, 'ability': 'pierce'
+            }
+        }
+        stats = ships[self.ship_type]
+        self.ship_name = stats['name']
+        self.ship_color = stats['color']
+        self.acceleration = stats['accel']
+        self.friction = stats['friction']
+        self.max_speed = stats['max_speed']
+        self.damage = stats['damage']
+        self.default_shoot_delay = stats['shoot_delay']
+        self.shoot_delay = self.default_shoot_delay
+        self.special_ability = stats['ability']
+        self.radius = 12
+        
+    def rotate(self, direction):
+        self.angle += direction * 5
+    
+    def thrust(self):
+        rad = math.radians(self.angle)
+        self.vel_x += math.cos(rad) * self.acceleration
+        self.vel_y += math.sin(rad) * self.acceleration
+        speed = math.sqrt(self.vel_x**2 + self.vel_y**2)
+        if speed > self.max_speed:
+            self.vel_x = (self.vel_x / speed) * self.max_speed
+            self.vel_y = (self.vel_y / speed) * self.max_speed
+    
+    def update(self):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.vel_x *= self.friction
+        self.vel_y *= self.friction
+        self.x += self.vel_x
+        self.y += self.vel_y
+        
+        if self.x < 0: self.x = WIDTH
+        elif self.x > WIDTH: self.x = 0
+        if self.y < 0: self.y = HEIGHT
+        elif self.y > HEIGHT: self.y = 0
+        
+        if self.shoot_cooldown > 0: self.shoot_cooldown -= 1
+        if self.invulnerable > 0: self.invulnerable -= 1
+        if self.weapon_timer > 0:
+            self.weapon_timer -= 1
+        else:
+            if self.weapon_type != 'normal':
+                self.weapon_type = 'normal'
+                self.shoot_delay = self.default_shoot_delay
+    
+    def can_shoot(self):
+        return self.shoot_cooldown == 0
+    
+    def shoot(self):
+        self.shoot_cooldown = self.shoot_delay
+    
+    def draw(self, screen):
+        if self.invulnerable > 0 and self.invulnerable % 10 < 5:
+            return
+        
+        rad = math.radians(self.angle)
+        
+        # Color changes with powerups
+        if self.weapon_type == 'spread':
+            color = YELLOW
+        elif self.weapon_type == 'rapid':
+            color = MAGENTA
+        else:
+            color = self.ship_color
+        
+        # Different ship designs
+        if self.ship_type == 'basic':
+            # Standard triangle
+            front = (self.x + math.cos(rad) * self.radius, self.y + math.sin(rad) * self.radius)
+            back_left = (self.x + math.cos(rad + 2.5) * self.radius, self.y + math.sin(rad + 2.5) * self.radius)
+            back_right = (self.x + math.cos(rad - 2.5) * self.radius, self.y + math.sin(rad - 2.5) * self.radius)
+            pygame.draw.polygon(screen, color, [front, back_left, (self.x, self.y), back_right], 2)
+            
+        elif self.ship_type == 'interceptor':
+            # Sleek arrow with wings
+            front = (self.x + math.cos(rad) * (self.radius + 4), self.y + math.sin(rad) * (self.radius + 4))
+            back_left = (self.x + math.cos(rad + 2.8) * self.radius, self.y + math.sin(rad + 2.8) * self.radius)
+            back_right = (self.x + math.cos(rad - 2.8) * self.radius, self.y + math.sin(rad - 2.8) * self.radius)
+            pygame.draw.polygon(screen, color, [front, back_left, back_right], 2)
+            # Speed lines
+            pygame.draw.line(screen, color, (self.x, self.y), front, 1)
+            
+        elif self.ship_type == 'tank':
+            # Wide heavy ship
+            front = (self.x + math.cos(rad) * self.radius, self.y + math.sin(rad) * self.radius)
+            back_left = (self.x + math.cos(rad + 2.2) * (self.radius + 3), self.y + math.sin(rad + 2.2) * (self.radius + 3))
+            back_right = (self.x + math.cos(rad - 2.2) * (self.radius + 3), self.y + math.sin(rad - 2.2) * (self.radius + 3))
+            pygame.draw.polygon(screen, color, [front, back_left, (self.x, self.y), back_right], 3)
+            # Armor plates
+            mid_left = (self.x + math.cos(rad + 1.8) * self.radius, self.y + math.sin(rad + 1.8) * self.radius)
+            mid_right = (self.x + math.cos(rad - 1.8) * self.radius, self.y + math.sin(rad - 1.8) * self.radius)
+            pygame.draw.line(screen, color, mid_left, mid_right, 2)
+            
+        elif self.ship_type == 'shotgun':
+            # Wide barrel design
+            front = (self.x + math.cos(rad) * self.radius, self.y + math.sin(rad) * self.radius)
+            back_left = (self.x + math.cos(rad + 2.4) * self.radius, self.y + math.sin(rad + 2.4) * self.radius)
+            back_right = (self.x + math.cos(rad - 2.4) * self.radius, self.y + math.sin(rad - 2.4) * self.radius)
+            pygame.draw.polygon(screen, color, [front, back_left, (self.x, self.y), back_right], 2)
+            # Multiple barrels
+            for offset in [-0.5, 0.5]:
+                barrel = (self.x + math.cos(rad + offset) * (self.radius - 2), 
+                         self.y + math.sin(rad + offset) * (self.radius - 2))
+                pygame.draw.circle(screen, color, (int(barrel[0]), int(barrel[1])), 2)
+                
+        elif self.ship_type == 'sniper':
+            # Long narrow design
+            front = (self.x + math.cos(rad) * (self.radius + 6), self.y + math.sin(rad) * (self.radius + 6))
+            back_left = (self.x + math.cos(rad + 3.0) * (self.radius - 2), self.y + math.sin(rad + 3.0) * (self.radius - 2))
+            back_right = (self.x + math.cos(rad - 3.0) * (self.radius - 2), self.y + math.sin(rad - 3.0) * (self.radius - 2))
+            pygame.draw.polygon(screen, color, [front, back_left, back_right], 2)
+            # Scope
+            scope = (self.x + math.cos(rad) * (self.radius + 2), self.y + math.sin(rad) * (self.radius + 2))
+            pygame.draw.circle(screen, color, (int(scope[0]), int(scope[1])), 3, 1)
+        
+        # Thruster
+        if abs(self.vel_x) > 0.5 or abs(self.vel_y) > 0.5:
+            back_x = self.x - math.cos(rad) * self.radius * 0.8
+            back_y = self.y - math.sin(rad) * self.radius * 0.8
+            pygame.draw.circle(screen, ORANGE, (int(back_x), int(back_y)), 3)
+
+class Bullet:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'lifetime', 'radius', 'owner', 'color',
+                 'damage', 'pierce', 'pierce_count', 'dead')
+
+    def __init__(self, x, y, angle, speed=10, owner='player', damage=1):
+        self.reset(x, y, angle, speed, owner, damage)
+
+    def reset(self, x, y, angle, speed=10, owner='player', damage=1):
+        self.x, self.y = x, y
+        self.prev_x, self.prev_y = x, y
+        rad = math.radians(angle)
+        self.vel_x = math.cos(rad) * speed
+        self.vel_y = math.sin(rad) * speed
+        self.lifetime = 60
+        self.radius = 3
+        self.owner = owner
+        self.color = WHITE if owner == 'player' else RED
+        self.damage = damage
+        self.pierce = False
+        self.pierce_count = 0
+        self.dead = False
+        
+    def update(self):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += self.vel_x
+        self.y += self.vel_y
+        self.lifetime -= 1
+        if self.x < 0: self.x = WIDTH
+        elif self.x > WIDTH: self.x = 0
+        if self.y < 0: self.y = HEIGHT
+        elif self.y > HEIGHT: self.y = 0
+    
+    def is_alive(self):
+        return self.lifetime > 0
+    
+    def draw(self, screen):
+        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+    
+    @staticmethod
+    def draw_all(screen, bullets, sprites=None):
+        """Blit every bullet in one Surface.blits() call from cached circle sprites."""
+        if sprites is None:
+            for bullet in bullets:
+                bullet.draw(screen)
+            return
+        surfaces = {}
+        batch = []
+        append = batch.append
+        color = r = surface = None
+        for bullet in bullets:
+            # Runs of bullets share a color and radius, so the lookup is rarely needed
+            if bullet.color is not color or bullet.radius != r:
+                color, r = bullet.color, bullet.radius
+                surface = surfaces.get((color, r))
+                if surface is None:
+                    surface = surfaces[color, r] = sprites.static(('circle', color, r, 0),
+                                                                  lambda: render_circle(color, r))
+            # blits() truncates float positions itself
+            append((surface, (bullet.x - r, bullet.y - r)))
+        screen.blits(batch, doreturn=False)
+
+def render_circle(color, radius, width=0):
+    surface = SpriteCache.new_surface(radius)
+    pygame.draw.circle(surface, color, (radius, radius), radius, width)
+    return surface
+
+class GeometricEnemy:
+    # Every enemy carries every role's fields, so update() and batched steering
+    # never need to probe for attributes
+    __slots__ = ('rng', 'x', 'y', 'prev_x', 'prev_y', 'shape_type', 'size', 'angle', 'rotation_speed', 'sides', 'color',
+                 'coin_value', 'dead', 'role', 'role_code', 'speed', 'health', 'vel_x', 'vel_y',
+                 'zig_timer', 'dash_timer', '_dash_ticks', 'dash_duration', 'dash_speed', 'is_dashing',
+                 'shield_timer', 'shield_active')
+    ROLE_CODES = {'swarm': 1, 'dasher': 2, 'shield': 3}
+    # shape -> (sides, color, base speed, base health, coin value)
+    SHAPES = {
+        'triangle': (3, RED, 2.5, 1, 5),
+        'square': (4, ORANGE, 1.5, 2, 10),
+        'pentagon': (5, YELLOW, 1, 3, 20),
+        'hexagon': (6, GREEN, 0.8, 4, 35)
+    }
+
+    def __init__(self, x, y, shape_type, size, role=None, rng=random):
+        # role: None or 'chaser' (default), 'dasher', 'swarm', 'shield'
+        # rng: random stream for this enemy's spawn rolls, timers and splits
+        self.rng = rng
+        self.x, self.y = x, y
+        self.prev_x, self.prev_y = x, y
+        self.shape_type = shape_type
+        self.size = size
+        self.angle = self.rng.uniform(0, 360)
+        self.rotation_speed = self.rng.uniform(-2, 2)
+
+        self.sides, self.color, base_speed, base_health, self.coin_value = self.SHAPES[shape_type]
+        self.dead = False
+        self.zig_timer = self.dash_timer = self._dash_ticks = self.shield_timer = 0
+        self.dash_duration = 12
+        self.dash_speed = 0
+        self.is_dashing = self.shield_active = False
+
+        # Role determines behavior tweaks
+        self.role = role or 'chaser'
+        # 0 (chaser / default homing), 1 swarm, 2 dasher, 3 shield
+        self.role_code = self.ROLE_CODES.get(self.role, 0)
+        # behavioral modifiers
+        if self.role == 'chaser':
+            self.speed = base_speed
+            self.health = base_health
+        elif self.role == 'swarm':
+            self.speed = max(1.8, base_speed + 1.2)
+            self.health = max(1, base_health)
+            # swarm noise for zig-zag
+            self.zig_timer = self.rng.randint(10, 30)
+        elif self.role == 'dasher':
+            self.speed = base_speed
+            self.health = max(1, base_health + 1)
+            self.dash_timer = self.rng.randint(40, 100)
+            self.is_dashing = False
+            self.dash_duration = 12
+            self.dash_speed = self.speed * 3.5
+
+        elif self.role == 'shield':
+            self.speed = max(0.6, base_speed - 0.4)
+            self.health = max(3, base_health + 3)
+            self.shield_active = True
+            self.shield_timer = self.rng.randint(80, 160)
+        else:
+            self.speed = base_speed
+            self.health = base_health
+
+        angle_rad = self.rng.uniform(0, 2 * math.pi)
+        self.vel_x = math.cos(angle_rad) * self.speed
+        self.vel_y = math.sin(angle_rad) * self.speed
+        
+    def update(self, player_x, player_y, ticks=0):
+        """
+        Update enemy state. Returns a list of Bullets this enemy fired (may be empty).
+        `ticks` is the simulation clock in milliseconds (drives the swarm wiggle).
+        """
+        spawned = []
+        self.prev_x, self.prev_y = self.x, self.y
+        dx, dy = player_x - self.x, player_y - self.y
+        dist = math.hypot(dx, dy)
+
+        # Behavior by role (movement + occasional firing)
+        if dist > 0:
+            role = self.role_code
+            # CHASER / default: straightforward homing
+            if role == 0:
+                self.vel_x += (dx / dist) * 0.12
+                self.vel_y += (dy / dist) * 0.12
+
+            # SWARM: zig-zag while moving toward player
+            elif role == 1:
+                self.zig_timer -= 1
+                wiggle = math.sin(ticks / 100 + self.zig_timer) * 0.6
+                self.vel_x += (dx / dist) * 0.06 + math.cos(wiggle) * 0.06
+                self.vel_y += (dy / dist) * 0.06 + math.sin(wiggle) * 0.06
+
+            # DASHER: build small attraction, occasionally perform a high-speed dash toward player
+            elif role == 2:
+                # decrement dash timer and handle dashing state
+                self.dash_timer -= 1
+                if not self.is_dashing:
+                    # small homing while charging
+                    self.vel_x += (dx / dist) * 0.04
+                    self.vel_y += (dy / dist) * 0.04
+                if self.dash_timer <= 0 and not self.is_dashing:
+                    self.is_dashing = True
+                    self.dash_timer = self.rng.randint(80, 160)
+                    rad = math.atan2(dy, dx)
+                    self.vel_x = math.cos(rad) * self.dash_speed
+                    self.vel_y = math.sin(rad) * self.dash_speed
+                    self._dash_ticks = self.dash_duration
+                if self._dash_ticks > 0:
+                    self._dash_ticks -= 1
+                    if self._dash_ticks <= 0:
+                        self.is_dashing = False
+
+            # SHIELD: slow approach, toggle shield occasionally
+            else:
+                self.shield_timer -= 1
+                if self.shield_timer <= 0:
+                    self.shield_active = not self.shield_active
+                    self.shield_timer = self.rng.randint(80, 160)
+                self.vel_x += (dx / dist) * 0.03
+                self.vel_y += (dy / dist) * 0.03
+
+        # Limit speed for non-dashing states
+        speed = math.hypot(self.vel_x, self.vel_y)
+        limit = self.dash_speed if self.is_dashing else self.speed
+        if speed > limit and limit > 0:
+            self.vel_x = (self.vel_x / speed) * limit
+            self.vel_y = (self.vel_y / speed) * limit
+
+        # Apply movement
+        self.x += self.vel_x
+        self.y += self.vel_y
+        self.angle += self.rotation_speed
+
+        # Wrap around
+        if self.x < -50: self.x = WIDTH + 50
+        elif self.x > WIDTH + 50: self.x = -50
+        if self.y < -50: self.y = HEIGHT + 50
+        elif self.y > HEIGHT + 50: self.y = -50
+
+        return spawned
+    
+    def hit(self, damage=1):
+        self.health -= damage
+        return self.health <= 0
+    
+    def split(self):
+        return self.split_at(self.x, self.y, self.shape_type, self.size, self.rng)
+    
+    @staticmethod
+    def split_at(x, y, shape_type, size, rng):
+        # Children of a killed enemy of this shape and size (horde enemies have no object to split)
+        if size > 15:
+            new_shapes = []
+            for i in range(2):
+                angle = rng.uniform(0, 360)
+                rad = math.radians(angle)
+                new_shape = GeometricEnemy(x + math.cos(rad) * 20, y + math.sin(rad) * 20,
+                                          shape_type, max(10, size // 2), rng=rng)
+                new_shapes.append(new_shape)
+            return new_shapes
+        return []
+    
+    def overlay_state(self):
+        if self.is_dashing:
+            return 'dash'
+        if self.role_code == 3 and self.shield_active:
+            return 'shield'
+        return None
+    
+    def draw(self, screen, sprites=None, detail=2):
+        # detail: 2 full, 1 without the inner polygon, 0 also without the dash glow
+        if sprites is not None:
+            # One blit of a cached, rotation-quantized sprite
+            overlay = self.overlay_state()
+            sprite = sprites.get(('enemy', self.sides, self.size, self.color, overlay, detail), self.angle,
+                                 360 / self.sides, lambda angle: self.render_sprite(angle, overlay, detail))
+            screen.blit(sprite, (int(self.x) - sprite.get_width() // 2, int(self.y) - sprite.get_height() // 2))
+            return
+        self.draw_shape(screen, self.x, self.y, self.angle, self.overlay_state(), detail)
+    
+    def render_sprite(self, angle, overlay, detail=2):
+        return self.render_shape_sprite(angle, self.sides, self.size, self.color, overlay, detail)
+    
+    @classmethod
+    def render_shape_sprite(cls, angle, sides, size, color, overlay, detail=2):
+        half = int(size * 1.2) + 3
+        surface = SpriteCache.new_surface(half)
+        cls.render_shape(surface, half, half, angle, sides, size, color, overlay, detail)
+        return surface
+    
+    def draw_shape(self, screen, x, y, angle, overlay, detail=2):
+        self.render_shape(screen, x, y, angle, self.sides, self.size, self.color, overlay, detail)
+    
+    @staticmethod
+    def render_shape(screen, x, y, angle, sides, size, color, overlay, detail=2):
+        points = [(x + math.cos(math.radians(angle + (360 / sides) * i)) * size,
+                   y + math.sin(math.radians(angle + (360 / sides) * i)) * size)
+                  for i in range(sides)]
+        # visual cues for roles
+        draw_color = color
+        pygame.draw.polygon(screen, draw_color, points, 3)
+        
+        if detail > 1:
+            inner_points = [(x + math.cos(math.radians(angle + (360 / sides) * i)) * (size * 0.7),
+                            y + math.sin(math.radians(angle + (360 / sides) * i)) * (size * 0.7))
+                           for i in range(sides)]
+            pygame.draw.polygon(screen, draw_color, inner_points, 1)
+
+        # role overlays; the shield ring stays at every detail level
+        if overlay == 'dash' and detail:
+            # glow while dashing
+            pygame.draw.circle(screen, (255, 180, 80), (int(x), int(y)), int(size*0.9), 2)
+        elif overlay == 'shield':
+            pygame.draw.circle(screen, (120, 180, 255), (int(x), int(y)), int(size*1.2), 2 if detail else 1)
+
+# Column layout of the batched steering state, one row per enemy
+STEER_FIELDS = ('x', 'y', 'vel_x', 'vel_y', 'angle', 'rotation_speed', 'speed', 'dash_speed',
+                'dash_duration', 'zig_timer', 'dash_timer', '_dash_ticks', 'shield_timer',
+                'is_dashing', 'shield_active', 'role_code')
+_steer_state = attrgetter(*STEER_FIELDS)
+
+def steer_arrays(state, player_x, player_y, ticks, roll):
+    """Vectorized GeometricEnemy.update() over a (N, len(STEER_FIELDS)) float array, in place.
+
+    Role behaviors run under per-role masks. roll(i) must return
+    rng.randint(80, 160) for row i; it is called in row order for each dash
+    start or shield toggle, which keeps the random stream in step with the
+    scalar path. Positions match the scalar path to floating-point rounding.
+    player_x and player_y are scalars, or per-row arrays in co-op.
+    """
+    (x, y, vx, vy, angle, rot, speed, dash_speed, dash_duration, zig, dash_timer, dash_ticks,
+     shield_timer, dashing, shield_on, code) = state.T
+
+    dx, dy = player_x - x, player_y - y
+    dist = np.hypot(dx, dy)
+    moving = dist > 0
+    ux = np.divide(dx, dist, out=np.zeros_like(dx), where=moving)
+    uy = np.divide(dy, dist, out=np.zeros_like(dy), where=moving)
+
+    # SWARM: zig-zag while moving toward player
+    m = moving & (code == 1)
+    zig[m] -= 1
+    wiggle = np.sin(ticks / 100 + zig[m]) * 0.6
+    vx[m] += ux[m] * 0.06 + np.cos(wiggle) * 0.06
+    vy[m] += uy[m] * 0.06 + np.sin(wiggle) * 0.06
+
+    # DASHER: home gently while charging, then dash straight at the player
+    dasher = moving & (code == 2)
+    dash_timer[dasher] -= 1
+    m = dasher & (dashing == 0)
+    vx[m] += ux[m] * 0.04
+    vy[m] += uy[m] * 0.04
+    start = m & (dash_timer <= 0)
+
+    # SHIELD: slow approach, toggle shield occasionally
+    shield = moving & (code == 3)
+    shield_timer[shield] -= 1
+    toggle = shield & (shield_timer <= 0)
+    shield_on[toggle] = 1 - shield_on[toggle]
+    vx[shield] += ux[shield] * 0.03
+    vy[shield] += uy[shield] * 0.03
+
+    # CHASER / default: straightforward homing
+    m = moving & (code == 0)
+    vx[m] += ux[m] * 0.12
+    vy[m] += uy[m] * 0.12
+
+    for i in np.flatnonzero(start | toggle).tolist():
+        if start[i]:
+            dash_timer[i] = roll(i)
+        else:
+            shield_timer[i] = roll(i)
+    dashing[start] = 1
+    rad = np.arctan2(dy[start], dx[start])
+    vx[start] = np.cos(rad) * dash_speed[start]
+    vy[start] = np.sin(rad) * dash_speed[start]
+    dash_ticks[start] = dash_duration[start]
+    m = dasher & (dash_ticks > 0)
+    dash_ticks[m] -= 1
+    dashing[m & (dash_ticks <= 0)] = 0
+
+    # Limit speed for non-dashing states
+    current = np.hypot(vx, vy)
+    limit = np.where(dashing != 0, dash_speed, speed)
+    m = (current > limit) & (limit > 0)
+    vx[m] = vx[m] / current[m] * limit[m]
+    vy[m] = vy[m] / current[m] * limit[m]
+
+    x += vx
+    y += vy
+    angle += rot
+
+    # Wrap around
+    lo, hi = x < -50, x > WIDTH + 50
+    x[lo], x[hi] = WIDTH + 50, -50
+    lo, hi = y < -50, y > HEIGHT + 50
+    y[lo], y[hi] = HEIGHT + 50, -50
+
+def nearest_targets(targets, x, y):
+    """For each point (x[i], y[i]), the coordinates of the nearest of `targets`
+    ((x, y) pairs), as arrays; plain scalars when there is a single target."""
+    if len(targets) == 1:
+        return targets[0]
+    tx, ty = np.array(targets, dtype=float).T
+    best = np.argmin((tx[:, None] - x) ** 2 + (ty[:, None] - y) ** 2, axis=0)
+    return tx[best], ty[best]
+
+class SteeringBatch:
+    """Batched GeometricEnemy.update() built on steer_arrays().
+
+    The state array persists between ticks and rows are only gathered for
+    enemies that joined the list since the last call. Every field is written
+    back, so the objects stay authoritative; anything that changes an enemy's
+    steering fields outside update() must call invalidate().
+    """
+    def __init__(self):
+        self.members = []
+        self.state = np.empty((0, len(STEER_FIELDS)))
+
+    def invalidate(self):
+        self.members = []
+
+    def gather(self, enemies):
+        if enemies == self.members:
+            return
+        pos = {id(e): i for i, e in enumerate(self.members)}
+        rows = np.array([pos.get(id(e), -1) for e in enemies], dtype=np.intp)
+        state = np.empty((len(enemies), len(STEER_FIELDS)))
+        kept = rows >= 0
+        state[kept] = self.state[rows[kept]]
+        for i in np.flatnonzero(~kept).tolist():
+            state[i] = _steer_state(enemies[i])
+        self.state = state
+        self.members = list(enemies)
+
+    def update(self, enemies, targets, ticks=0):
+        """Steer `enemies`, each toward the nearest of `targets` ((x, y) pairs)."""
+        if not enemies:
+            return
+        self.gather(enemies)
+        state = self.state
+        prev = state[:, :2].tolist()
+        player_x, player_y = nearest_targets(targets, state[:, 0], state[:, 1])
+        steer_arrays(state, player_x, player_y, ticks, lambda i: enemies[i].rng.randint(80, 160))
+        columns = state.T.tolist()
+        for e, (px, py), ex, ey, evx, evy, ea, c, z, dt, dk, st, dsh, sh in zip(
+                enemies, prev, columns[0], columns[1], columns[2], columns[3], columns[4], columns[15],
+                columns[9], columns[10], columns[11], columns[12], columns[13], columns[14]):
+            e.prev_x, e.prev_y = px, py
+            e.x, e.y, e.vel_x, e.vel_y, e.angle = ex, ey, evx, evy, ea
+            if c == 1:
+                e.zig_timer = int(z)
+            elif c == 2:
+                e.dash_timer, e._dash_ticks, e.is_dashing = int(dt), int(dk), dsh != 0
+            elif c == 3:
+                e.shield_timer, e.shield_active = int(st), sh != 0
+
+class HordeSwarm:
+    """Struct-of-arrays enemy store for horde mode.
+
+    Rows use the STEER_FIELDS layout, so steer_arrays() moves every enemy in
+    one call; size, health, shape and the position before the last step sit
+    in side arrays. Enemies arrive as GeometricEnemy objects, so spawn rolls
+    and role setup stay in one place, and are flattened into a row. draw()
+    snaps sizes to SIZE_STEP to keep the number of distinct sprites small;
+    collisions and splits use the real size.
+    """
+    SHAPES = ('triangle', 'square', 'pentagon', 'hexagon')
+    OVERLAYS = (None, 'dash', 'shield')
+    SIZE_STEP = 6
+    CELL = 64
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.state = np.zeros((capacity, len(STEER_FIELDS)))
+        self.prev = np.zeros((capacity, 2))
+        self.size = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.shape = np.zeros(capacity, dtype=np.int8)
+
+    def _grow(self, needed):
+        n = self.count
+        old = (self.state, self.prev, self.size, self.health, self.shape)
+        self._allocate(max(needed, len(self.size) * 2))
+        for new, arr in zip((self.state, self.prev, self.size, self.health, self.shape), old):
+            new[:n] = arr[:n]
+
+    def __len__(self):
+        return self.count
+
+    def add(self, enemy):
+        n = self.count
+        if n == len(self.size):
+            self._grow(n + 1)
+        self.state[n] = _steer_state(enemy)
+        self.prev[n] = enemy.x, enemy.y
+        self.size[n] = enemy.size
+        self.health[n] = enemy.health
+        self.shape[n] = self.SHAPES.index(enemy.shape_type)
+        self.count = n + 1
+
+    def compact(self):
+        """Drop every row whose health ran out."""
+        n = self.count
+        alive = self.health[:n] > 0
+        if not alive.all():
+            for arr in (self.state, self.prev, self.size, self.health, self.shape):
+                survivors = arr[:n][alive]
+                arr[:len(survivors)] = survivors
+            self.count = int(alive.sum())
+
+    def steer(self, targets, ticks, rng):
+        n = self.count
+        if not n:
+            return
+        self.prev[:n] = self.state[:n, :2]
+        player_x, player_y = nearest_targets(targets, self.state[:n, 0], self.state[:n, 1])
+        steer_arrays(self.state[:n], player_x, player_y, ticks, lambda i: rng.randint(80, 160))
+
+    def hits(self, bullets):
+        """(bullet index, rows) for every bullet that came within an enemy's size
+        during the last step, in bullet order with each bullet's rows ascending.
+
+        The same swept test as swept_hit(), run over all candidate pairs at
+        once. Rows are bucketed by grid cell and sorted so that a run of cells
+        in one grid column is one slice, found with a single searchsorted.
+        """
+        n = self.count
+        if not n or not bullets:
+            return []
+        ex, ey = self.state[:n, 0], self.state[:n, 1]
+        dx, dy = ex - self.prev[:n, 0], ey - self.prev[:n, 1]
+        jumped = (np.abs(dx) >= MAX_STEP_MOVE) | (np.abs(dy) >= MAX_STEP_MOVE)
+        dx[jumped] = 0
+        dy[jumped] = 0
+        size = self.size[:n]
+        margin = float((size + np.maximum(np.abs(dx), np.abs(dy))).max())
+        cs = self.CELL
+        cells = (ex // cs).astype(np.int64) * 4096 + (ey // cs).astype(np.int64)
+        order = np.argsort(cells, kind='stable')
+        cells = cells[order]
+
+        # One segment per bullet; a bullet that wrapped is swept along its
+        # velocity from where it was and tested again where it reappeared,
+        # both against the enemies' current positions
+        segments, lo_keys, hi_keys, owners = [], [], [], []
+        for i, b in enumerate(bullets):
+            if b.dead:
+                continue
+            if wrapped(b):
+                segments.append((i, b.prev_x, b.prev_y, b.vel_x, b.vel_y, 0.0))
+                segments.append((i, b.x, b.y, 0.0, 0.0, 0.0))
+            else:
+                segments.append((i, b.prev_x, b.prev_y, b.x - b.prev_x, b.y - b.prev_y, 1.0))
+        if not segments:
+            return []
+        for s, (_, x0, y0, sdx, sdy, _) in enumerate(segments):
+            gy0, gy1 = int((min(y0, y0 + sdy) - margin) // cs), int((max(y0, y0 + sdy) + margin) // cs)
+            for gx in range(int((min(x0, x0 + sdx) - margin) // cs), int((max(x0, x0 + sdx) + margin) // cs) + 1):
+                lo_keys.append(gx * 4096 + gy0)
+                hi_keys.append(gx * 4096 + gy1)
+                owners.append(s)
+        lo = np.searchsorted(cells, lo_keys, 'left')
+        lengths = np.searchsorted(cells, hi_keys, 'right') - lo
+        total = int(lengths.sum())
+        if not total:
+            return []
+        starts = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+        rows = order[starts + np.arange(total)]
+        seg = np.array(segments)[np.repeat(owners, lengths)]
+
+        rel = seg[:, 5]
+        edx, edy = dx[rows] * rel, dy[rows] * rel
+        fx, fy = ex[rows] - edx - seg[:, 1], ey[rows] - edy - seg[:, 2]
+        mdx, mdy = seg[:, 3] - edx, seg[:, 4] - edy
+        length2 = mdx * mdx + mdy * mdy
+        t = np.divide(fx * mdx + fy * mdy, length2, out=np.zeros_like(fx), where=length2 > 0)
+        np.clip(t, 0, 1, out=t)
+        hit = (fx - mdx * t) ** 2 + (fy - mdy * t) ** 2 < size[rows] ** 2
+        if not hit.any():
+            return []
+        # A wrapped bullet's two segments can both find a row
+        pairs = np.sort(seg[hit, 0].astype(np.int64) * n + rows[hit])
+        owner, rows = np.divmod(pairs[np.r_[True, pairs[1:] != pairs[:-1]]], n)
+        bounds = np.flatnonzero(np.diff(owner)) + 1
+        return [(int(group[0]), group_rows) for group, group_rows in
+                zip(np.split(owner, bounds), np.split(rows, bounds)) if len(group)]
+
+    def touching(self, x, y, radius):
+        """First row overlapping the circle at (x, y), or -1."""
+        n = self.count
+        if not n:
+            return -1
+        reach = self.size[:n] + radius
+        found = np.flatnonzero((self.state[:n, 0] - x) ** 2 + (self.state[:n, 1] - y) ** 2 < reach * reach)
+        return int(found[0]) if len(found) else -1
+
+    def nearest(self, x, y):
+        n = self.count
+        if not n:
+            return None
+        i = int(np.argmin((self.state[:n, 0] - x) ** 2 + (self.state[:n, 1] - y) ** 2))
+        return float(self.state[i, 0]), float(self.state[i, 1])
+
+    def draw(self, screen, sprites, detail=2):
+        """Blit every enemy in one Surface.blits() call, sharing GeometricEnemy's cached sprites."""
+        n = self.count
+        if not n:
+            return
+        st = self.state[:n]
+        shape = self.shape[:n].astype(np.int64)
+        period = 360.0 / (shape + 3)
+        buckets = np.maximum(1, np.rint(period / sprites.angle_step)).astype(np.int64)
+        bucket = np.rint(np.mod(st[:, 4], period) / period * buckets).astype(np.int64) % buckets
+        overlay = np.where(st[:, 13] != 0, 1, np.where((st[:, 15] == 3) & (st[:, 14] != 0), 2, 0))
+        step = self.SIZE_STEP
+        size = np.maximum(2 * step, step * np.floor(self.size[:n] / step + 0.5)).astype(np.int64)
+        keys, inverse = np.unique(((shape * 64 + size) * 3 + overlay) * 64 + bucket,
+                                  return_inverse=True)
+        surfaces = np.empty(len(keys), dtype=object)
+        halves = []
+        for j, key in enumerate(keys.tolist()):
+            key, b = divmod(key, 64)
+            key, o = divmod(key, 3)
+            k, size = divmod(key, 64)
+            sides, color = GeometricEnemy.SHAPES[self.SHAPES[k]][:2]
+            overlay_name = self.OVERLAYS[o]
+            p = 360 / sides
+            sprite = sprites.get(('enemy', sides, size, color, overlay_name, detail),
+                                 b * p / max(1, int(round(p / sprites.angle_step))), p,
+                                 lambda angle: GeometricEnemy.render_shape_sprite(angle, sides, size, color,
+                                                                                  overlay_name, detail))
+            surfaces[j] = sprite
+            halves.append(sprite.get_width() // 2)
+        inverse = inverse.ravel()
+        half = np.array(halves)[inverse]
+        xs = (st[:, 0].astype(np.int64) - half).tolist()
+        ys = (st[:, 1].astype(np.int64) - half).tolist()
+        screen.blits(zip(surfaces[inverse].tolist(), zip(xs, ys)), doreturn=False)
+
+class BossEnemy:
+    def __init__(self, x, y, boss_index, rng=random):
+        self.rng = rng
+        self.x, self.y = x, y
+        self.prev_x, self.prev_y = x, y
+        self.angle = self.rng.uniform(0, 360)
+        self.size = 70 + (boss_index * 10)
+        self.color = PURPLE if boss_index % 2 == 0 else BLUE
+        self.health = 80 + (boss_index * 35)
+        self.max_health = self.health
+        self.speed = 0.5 + (boss_index * 0.12)
+        self.rotation_speed = self.rng.uniform(-1, 1)
+        self.minion_timer = 160
+        self.attack_timer = 90
+        self.boss_index = boss_index
+        self.sides = 8
+        self.type = (boss_index - 1) % 3
+        self.minion_strength = max(1, 1 + boss_index // 3)
+        self.projectile_speed = 6 + boss_index
+        self.projectile_count = 1 + (boss_index // 2)
+    
+    def update(self, player_x, player_y, enemies, boss_projectiles, bullet_pool=None):
+        # bullet_pool: ObjectPool the projectiles are drawn from (plain Bullets without one)
+        new_bullet = bullet_pool.acquire if bullet_pool else Bullet
+        self.prev_x, self.prev_y = self.x, self.y
+        dx, dy = player_x - self.x, player_y - self.y
+        dist = math.sqrt(dx**2 + dy**2)
+        if dist > 0:
+            self.x += (dx / dist) * self.speed
+            self.y += (dy / dist) * self.speed
+        self.angle += self.rotation_speed
+
+        if self.x < -120: self.x = WIDTH + 120
+        elif self.x > WIDTH + 120: self.x = -120
+        if self.y < -120: self.y = HEIGHT + 120
+        elif self.y > HEIGHT + 120: self.y = -120
+
+        angle_to_player = math.degrees(math.atan2(player_y - self.y, player_x - self.x))
+
+        if self.type == 0:
+            self.minion_timer -= 1
+            if self.minion_timer <= 0:
+                self.minion_timer = max(50, 160 - (self.boss_index * 8))
+                for _ in range(self.rng.randint(1, min(2, self.minion_strength))):
+                    enemies.append(GeometricEnemy(self.x + self.rng.uniform(-30, 30), 
+                                                  self.y + self.rng.uniform(-30, 30),
+                                                  self.rng.choice(['triangle', 'square']), 20, rng=self.rng))
+            self.attack_timer -= 1
+            if self.attack_timer <= 0:
+                self.attack_timer = 200 - (self.boss_index * 4)
+                boss_projectiles.append(new_bullet(self.x, self.y, angle_to_player + self.rng.uniform(-8, 8),
+                                                  self.projectile_speed - 2, 'boss'))
+
+        elif self.type == 1:
+            self.attack_timer -= 1
+            if self.attack_timer <= 0:
+                self.attack_timer = max(30, 110 - (self.boss_index * 6))
+                spread = 10 + (self.boss_index * 1.5)
+                for i in range(self.projectile_count):
+                    offset = (i - (self.projectile_count - 1) / 2) * (spread / max(1, self.projectile_count))
+                    boss_projectiles.append(new_bullet(self.x, self.y, angle_to_player + offset,
+                                                       self.projectile_speed, 'boss'))
+            self.minion_timer -= 1
+            if self.minion_timer <= 0:
+                self.minion_timer = 240
+                if self.rng.random() < 0.4:
+                    enemies.append(GeometricEnemy(self.x + self.rng.uniform(-20, 20),
+                                                  self.y + self.rng.uniform(-20, 20),
+                                                  self.rng.choice(['triangle', 'square']), 22, rng=self.rng))
+        else:
+            self.minion_timer -= 1
+            self.attack_timer -= 1
+            if self.minion_timer <= 0:
+                self.minion_timer = max(80, 180 - (self.boss_index * 6))
+                if self.rng.random() < 0.8:
+                    enemies.append(GeometricEnemy(self.x + self.rng.uniform(-25, 25),
+                                                  self.y + self.rng.uniform(-25, 25),
+                                                  self.rng.choice(['triangle', 'square']), 22, rng=self.rng))
+            if self.attack_timer <= 0:
+                self.attack_timer = max(60, 150 - (self.boss_index * 5))
+                for i in range(self.rng.randint(1, self.projectile_count)):
+                    boss_projectiles.append(new_bullet(self.x, self.y, angle_to_player + self.rng.uniform(-12, 12),
+                                                       self.projectile_speed, 'boss'))
+
+    def hit(self, damage=1):
+        self.health -= damage
+        return self.health <= 0
+
+    def draw(self, screen, sprites=None):
+        if sprites is not None:
+            sprite = sprites.get(('boss', self.sides, self.size, self.color), self.angle, 360 / self.sides,
+                                 self.render_sprite)
+            screen.blit(sprite, (int(self.x) - sprite.get_width() // 2, int(self.y) - sprite.get_height() // 2))
+        else:
+            self.draw_shape(screen, self.x, self.y, self.angle)
+
+        health_ratio = max(0, self.health / self.max_health)
+        bar_width, bar_height = 160, 12
+        pygame.draw.rect(screen, RED, (self.x - bar_width/2, self.y - self.size - 30, bar_width, bar_height))
+        pygame.draw.rect(screen, GREEN, (self.x - bar_width/2, self.y - self.size - 30, 
+                                        bar_width * health_ratio, bar_height))
+
+    def render_sprite(self, angle):
+        half = self.size + 3
+        surface = SpriteCache.new_surface(half)
+        self.draw_shape(surface, half, half, angle)
+        return surface
+
+    def draw_shape(self, screen, x, y, angle):
+        points = [(x + math.cos(math.radians(angle + (360 / self.sides) * i)) * self.size,
+                   y + math.sin(math.radians(angle + (360 / self.sides) * i)) * self.size)
+                  for i in range(self.sides)]
+        pygame.draw.polygon(screen, self.color, points, 4)
+
+class PowerUp:
+    __slots__ = ('x', 'y', 'type', 'lifetime', 'radius', 'color', 'dead')
+    # Ring radius by lifetime % 40: the draw() pulse for the standard radius of 15
+    PULSE = tuple(int(15 + abs(i - 20) / 20 * 5) for i in range(40))
+
+    def __init__(self, x, y, power_type):
+        self.reset(x, y, power_type)
+
+    def reset(self, x, y, power_type):
+        self.x, self.y = x, y
+        self.type = power_type
+        self.lifetime = 300
+        self.radius = 15
+        colors = {'spread': YELLOW, 'rapid': MAGENTA, 'life': GREEN}
+        self.color = colors[power_type]
+        self.dead = False
+    
+    def update(self):
+        self.lifetime -= 1
+    
+    def is_alive(self):
+        return self.lifetime > 0
+    
+    def draw(self, screen):
+        pulse = abs((self.lifetime % 40) - 20) / 20
+        radius = int(self.radius + pulse * 5)
+        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), radius, 2)
+        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), radius - 5, 1)
+    
+    @classmethod
+    def draw_all(cls, screen, powerups, sprites=None):
+        """Blit every powerup in one Surface.blits() call from cached ring sprites."""
+        if sprites is None:
+            for powerup in powerups:
+                powerup.draw(screen)
+            return
+        pulse = cls.PULSE
+        batch = []
+        for powerup in powerups:
+            color, r = powerup.color, pulse[powerup.lifetime % 40] + powerup.radius - 15
+            surface = sprites.static(('powerup', color, r), lambda: cls.render_sprite(color, r))
+            batch.append((surface, (powerup.x - r, powerup.y - r)))
+        screen.blits(batch, doreturn=False)
+    
+    @staticmethod
+    def render_sprite(color, radius):
+        surface = render_circle(color, radius, 2)
+        pygame.draw.circle(surface, color, (radius, radius), radius - 5, 1)
+        return surface
+
+class ObjectPool:
+    """Free list of released objects for a class with a reset() initializer.
+
+    acquire() takes the same arguments as the class constructor and reuses a
+    released object when one is available, so steady fire stops allocating.
+    Released objects must no longer be referenced by any entity list.
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.in_use = 0
+        self.high_water = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            obj = self.cls(*args)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def release_all(self, objs):
+        self.in_use -= len(objs)
+        self.free.extend(objs)
+
+    def stats(self):
+        return {'size': self.in_use + len(self.free), 'in_use': self.in_use, 'free': len(self.free),
+                'high_water': self.high_water, 'created': self.created, 'reused': self.reused}
+
+class ParticleSystem:
+    """Struct-of-arrays particle store.
+
+    Position, velocity, lifetime, size and color live in preallocated NumPy
+    arrays. update() steps every particle at once and compacts the survivors to
+    the front instead of removing dead particles one by one.
+    """
+    LIFETIME = 30
+    DAMPING = 0.95
+
+    def __init__(self, capacity=256, rng=None):
+        self.count = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Fraction of each emit() count actually spawned (see QualityGovernor);
+        # 0 turns emission off for simulations nobody watches
+        self.emit_scale = 1.0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def _grow(self, needed):
+        n = self.count
+        old = (self.pos, self.vel, self.life, self.size, self.color)
+        self._allocate(max(needed, len(self.life) * 2))
+        for new, arr in zip((self.pos, self.vel, self.life, self.size, self.color), old):
+            new[:n] = arr[:n]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, color, count, jitter=0):
+        if self.emit_scale < 1:
+            if self.emit_scale <= 0:
+                return
+            count = max(1, int(count * self.emit_scale))
+        n = self.count
+        if n + count > len(self.life):
+            self._grow(n + count)
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(2, 6, count)
+        end = n + count
+        self.pos[n:end] = (x, y)
+        if jitter:
+            self.pos[n:end] += rng.uniform(-jitter, jitter, (count, 2))
+        self.vel[n:end, 0] = np.cos(angle) * speed
+        self.vel[n:end, 1] = np.sin(angle) * speed
+        self.life[n:end] = self.LIFETIME
+        self.size[n:end] = rng.integers(2, 5, count)
+        self.color[n:end] = color
+        self.count = end
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        life = self.life[:n]
+        self.pos[:n] += self.vel[:n]
+        life -= 1
+        self.vel[:n] *= self.DAMPING
+        alive = life > 0
+        if not alive.all():
+            for arr in (self.pos, self.vel, self.life, self.size, self.color):
+                survivors = arr[:n][alive]
+                arr[:len(survivors)] = survivors
+            self.count = int(alive.sum())
+
+    def draw(self, screen, sprites=None):
+        n = self.count
+        if not n:
+            return
+        if sprites is None:
+            for pos, size, color in zip(self.pos[:n].astype(int).tolist(), self.size[:n].tolist(),
+                                        self.color[:n].tolist()):
+                pygame.draw.circle(screen, color, pos, size)
+            return
+        # One cached circle per (color, size) and a single blits() call
+        size = self.size[:n].astype(np.int64)
+        color = self.color[:n].astype(np.int64)
+        keys = (((color[:, 0] << 16 | color[:, 1] << 8 | color[:, 2]) << 8) | size).tolist()
+        surfaces = {}
+        for key in set(keys):
+            rgb, r = divmod(key, 256)
+            rgb = (rgb >> 16, rgb >> 8 & 255, rgb & 255)
+            surfaces[key] = sprites.static(('circle', rgb, r, 0), lambda: render_circle(rgb, r))
+        corner = self.pos[:n].astype(np.int64) - size[:, None]
+        screen.blits(zip(map(surfaces.__getitem__, keys), corner.tolist()), doreturn=False)
+
+class SpriteCache:
+    """Bounded LRU cache of pre-rendered, rotation-quantized shape sprites.
+
+    get() rounds the angle to the nearest angle_step within the shape's
+    rotational symmetry period, so a spinning enemy reuses the same handful of
+    surfaces. Sprites are colorkeyed, RLE-accelerated surfaces; the least
+    recently used ones are evicted once their pixels exceed max_bytes.
+    """
+    COLORKEY = (0, 0, 0)
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, angle_step=4):
+        self.max_bytes = max_bytes
+        self.angle_step = angle_step
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    @classmethod
+    def new_surface(cls, half):
+        surface = pygame.Surface((half * 2 + 1, half * 2 + 1))
+        surface.fill(cls.COLORKEY)
+        return surface
+
+    def get(self, key, angle, period, render):
+        buckets = max(1, int(round(period / self.angle_step)))
+        bucket = int(round((angle % period) / period * buckets)) % buckets
+        key = key + (bucket,)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+        self.misses += 1
+        return self._store(key, render(bucket * period / buckets))
+
+    def static(self, key, render):
+        """Cached sprite that does not rotate; render() takes no arguments."""
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+        self.misses += 1
+        return self._store(key, render())
+
+    def _store(self, key, surface):
+        surface.set_colorkey(self.COLORKEY, pygame.RLEACCEL)
+        self.entries[key] = surface
+        self.bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+class SpatialHash:
+    """Uniform grid broad-phase for the collision passes in GeometricAsteroids.update.
+
+    Cells are keyed by unbounded integer coordinates, so entities sitting in the
+    wrap margins (enemies at -50..WIDTH+50, the boss at +-120) hash like any other
+    position. Every entry carries its insertion order, which lets callers visit
+    candidates in the same order as the list they were built from.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def _span(self, x, y, radius):
+        cs = self.cell_size
+        return (range(int((x - radius) // cs), int((x + radius) // cs) + 1),
+                range(int((y - radius) // cs), int((y + radius) // cs) + 1))
+
+    def insert(self, obj, x, y, radius=0):
+        entry = (self.count, obj)
+        self.count += 1
+        cells = self.cells
+        xs, ys = self._span(x, y, radius)
+        for cx in xs:
+            for cy in ys:
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = [entry]
+                else:
+                    cell.append(entry)
+        return entry
+
+    def remove(self, entry, x, y, radius=0):
+        # Position must be the one the entry was inserted with
+        xs, ys = self._span(x, y, radius)
+        for cx in xs:
+            for cy in ys:
+                cell = self.cells.get((cx, cy))
+                if cell and entry in cell:
+                    cell.remove(entry)
+
+    def query_point(self, x, y):
+        cs = self.cell_size
+        # Copy so entries inserted while the caller iterates are not visited
+        return list(self.cells.get((int(x // cs), int(y // cs)), ()))
+
+    def query_circle(self, x, y, radius):
+        found = {}
+        xs, ys = self._span(x, y, radius)
+        for cx in xs:
+            for cy in ys:
+                for entry in self.cells.get((cx, cy), ()):
+                    found[entry[0]] = entry
+        return [found[order] for order in sorted(found)]
+
+    def query_segment(self, x0, y0, dx, dy):
+        # Every cell touching the bounding box of the segment from (x0, y0) along (dx, dy)
+        return self.query_circle(x0 + dx / 2, y0 + dy / 2, max(abs(dx), abs(dy)) / 2)
+
+def segment_hits_circle(x0, y0, dx, dy, cx, cy, r):
+    """True if the segment from (x0, y0) to (x0 + dx, y0 + dy) passes within r of (cx, cy)."""
+    fx, fy = cx - x0, cy - y0
+    length2 = dx * dx + dy * dy
+    t = (fx * dx + fy * dy) / length2 if length2 else 0.0
+    if t < 0: t = 0.0
+    elif t > 1: t = 1.0
+    ex, ey = fx - dx * t, fy - dy * t
+    return ex * ex + ey * ey < r * r
+
+def step_reach(obj):
+    """How far `obj` moved along either axis in its last update(); 0 if it wrapped."""
+    d = max(abs(obj.x - obj.prev_x), abs(obj.y - obj.prev_y))
+    return d if d < MAX_STEP_MOVE else 0
+
+def wrapped(obj):
+    return abs(obj.x - obj.prev_x) >= MAX_STEP_MOVE or abs(obj.y - obj.prev_y) >= MAX_STEP_MOVE
+
+def swept_hit(mover, target, r):
+    """True if `mover` came within r of `target` at any point during the last step.
+
+    Both travelled from prev_x/prev_y to x/y, and the test runs in the
+    target's frame, so a fast bullet cannot skip over a small enemy and a
+    dashing enemy cannot skip over a bullet. If either wrapped around the
+    screen, the mover is swept along its velocity from where it was and then
+    tested where it reappeared, both against the target's current position.
+    """
+    mdx, mdy = mover.x - mover.prev_x, mover.y - mover.prev_y
+    tdx, tdy = target.x - target.prev_x, target.y - target.prev_y
+    if (-MAX_STEP_MOVE < mdx < MAX_STEP_MOVE and -MAX_STEP_MOVE < mdy < MAX_STEP_MOVE and
+            -MAX_STEP_MOVE < tdx < MAX_STEP_MOVE and -MAX_STEP_MOVE < tdy < MAX_STEP_MOVE):
+        return segment_hits_circle(mover.prev_x - target.prev_x, mover.prev_y - target.prev_y,
+                                   mdx - tdx, mdy - tdy, 0, 0, r)
+    tx, ty = target.x, target.y
+    if segment_hits_circle(mover.prev_x, mover.prev_y, mover.vel_x, mover.vel_y, tx, ty, r):
+        return True
+    return (mover.x - tx) ** 2 + (mover.y - ty) ** 2 < r * r
+
+class PhaseTimer:
+    """Wall-clock time per named phase of a frame.
+
+    Attach one as GameSimulation.phase_timer or GeometricAsteroids.phase_timer;
+    update() and draw() call start() once and lap(name) after each phase.
+    """
+    def __init__(self):
+        self.samples = {}
+        self._last = 0.0
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        samples = self.samples.get(name)
+        if samples is None:
+            self.samples[name] = [now - self._last]
+        else:
+            samples.append(now - self._last)
+        self._last = now
+
+    def clear(self):
+        self.samples.clear()
+
+class FrameProfiler(PhaseTimer):
+    """PhaseTimer that groups laps into per-frame records instead of keeping every sample.
+
+    Laps add up within a frame (a frame can run several simulation steps).
+    end_frame() closes the frame with the simulation's entity counts, wave,
+    ship and boss (its boss_index, 0 without one) and keeps the record in a
+    ring of recent frames. With log_path set, each record is also written to
+    a rolling CSV or JSONL file, picked by extension; after max_rows rows the
+    file moves to <log_path>.1 and a new one starts.
+    """
+    PHASES = ('input.events', 'input.read', 'update.entities', 'update.enemies', 'update.boss',
+              'collide.boss', 'collide.enemies', 'collide.projectiles', 'collide.player',
+              'collide.powerups', 'update.wave', 'draw.background', 'draw.particles', 'draw.enemies',
+              'draw.projectiles', 'draw.player', 'draw.hud', 'draw.overlay', 'draw.flip')
+    COUNTS = ('enemies', 'bullets', 'projectiles', 'powerups', 'particles', 'horde')
+    STATE = ('wave', 'ship', 'boss')
+
+    def __init__(self, history=240, log_path=None, max_rows=100000):
+        super().__init__()
+        self.history = deque(maxlen=history)
+        self.frames = 0
+        self.current = {}
+        self.log_path = log_path
+        self.max_rows = max_rows
+        self._log = None
+        self._rows = 0
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def end_frame(self, sim):
+        phases, self.current = self.current, {}
+        counts = (len(sim.enemies), len(sim.bullets), len(sim.boss_projectiles), len(sim.powerups),
+                  len(sim.particles), len(sim.horde) if sim.horde is not None else 0)
+        state = (sim.wave, sim.player.ship_type, sim.boss.boss_index if sim.boss else 0)
+        record = (self.frames, sum(phases.values()), phases, counts, state)
+        self.frames += 1
+        self.history.append(record)
+        if self.log_path:
+            self.write(record)
+        return record
+
+    def write(self, record):
+        frame, total, phases, counts, state = record
+        csv = not self.log_path.endswith('.jsonl')
+        if self._log is None or self._rows >= self.max_rows:
+            if self._log is not None:
+                self._log.close()
+                os.replace(self.log_path, self.log_path + '.1')
+            self._log = open(self.log_path, 'w')
+            self._rows = 0
+            if csv:
+                self._log.write(','.join(('frame', 'total_ms') + self.PHASES + self.COUNTS + self.STATE) + '\n')
+        if csv:
+            values = [str(frame), f'{total * 1000:.3f}']
+            values += [f'{phases.get(name, 0.0) * 1000:.3f}' for name in self.PHASES]
+            values += [str(c) for c in counts + state]
+            self._log.write(','.join(values) + '\n')
+        else:
+            row = {'frame': frame, 'total_ms': round(total * 1000, 3),
+                   'phases': {name: round(t * 1000, 3) for name, t in phases.items()}}
+            row.update(zip(self.COUNTS, counts))
+            row.update(zip(self.STATE, state))
+            self._log.write(json.dumps(row) + '\n')
+        self._rows += 1
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.log_path = None
+
+class QualityGovernor:
+    """Trades render detail for frame time.
+
+    update() is fed every frame's update + draw time. Once the mean of the last
+    `window` frames runs over budget_ms, the level drops one step; after
+    `recover_frames` frames whose mean stays under `headroom` of the budget, it
+    climbs back one. The window restarts after each change, so the next
+    decision only sees frames rendered at the new level.
+    """
+    # particle emission scale, enemy detail (2 inner polygon + role overlays,
+    # 1 role overlays, 0 outline and a thin shield ring), translucent HUD panels
+    LEVELS = (
+        (1.0, 2, True),
+        (0.5, 1, True),
+        (0.25, 1, False),
+        (0.1, 0, False),
+    )
+
+    def __init__(self, budget_ms=1000 / FPS, window=30, headroom=0.6, recover_frames=2 * FPS):
+        self.budget_ms = budget_ms
+        self.headroom = headroom
+        self.recover_frames = recover_frames
+        self.times = deque(maxlen=window)
+        self.level = 0
+        self.frames = 0
+        # Last frame whose window mean was not under the headroom
+        self.busy_at = 0
+        self.mean_ms = 0.0
+        # (frame, old level, new level, mean ms that triggered it), newest last
+        self.changes = deque(maxlen=4)
+
+    @property
+    def particle_scale(self):
+        return self.LEVELS[self.level][0]
+
+    @property
+    def enemy_detail(self):
+        return self.LEVELS[self.level][1]
+
+    @property
+    def hud_alpha(self):
+        return self.LEVELS[self.level][2]
+
+    def update(self, frame_ms):
+        """Record one frame; returns True when the level changed."""
+        self.frames += 1
+        times = self.times
+        times.append(frame_ms)
+        if len(times) < times.maxlen:
+            return False
+        self.mean_ms = mean = sum(times) / len(times)
+        if mean > self.budget_ms and self.level < len(self.LEVELS) - 1:
+            return self.set_level(self.level + 1)
+        if mean >= self.budget_ms * self.headroom:
+            self.busy_at = self.frames
+        elif self.level > 0 and self.frames - self.busy_at >= self.recover_frames:
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.changes.append((self.frames, self.level, level, self.mean_ms))
+        self.level = level
+        self.busy_at = self.frames
+        self.times.clear()
+        return True
+
+class InputLatency:
+    """Time from each input event to the first flip that shows its effect.
+
+    The view reports every input event as it pumps it (event), each time
+    the simulation reads input for a step (sample) and each flip (flip). An
+    event counts from when it arrived: the `t` perf_counter stamp of an
+    injected event (see inject_mouse_motion) or, for a real one, when it was
+    pumped, as SDL's own timestamps are not exposed. It is sampled by the
+    next read and shown by the first flip after that. Events never sampled
+    within `timeout` seconds (say during game over) are dropped.
+    """
+    KINDS = ('aim', 'button', 'key')
+
+    def __init__(self, history=600, timeout=1.0):
+        self.timeout = timeout
+        self.pending = []
+        self.sampled = []
+        self.dropped = 0
+        self.flips = 0
+        # kind -> recent (event to flip, event to sample, sample to flip) seconds
+        self.samples = {kind: deque(maxlen=history) for kind in self.KINDS}
+
+    def event(self, kind, t):
+        self.pending.append((kind, t))
+
+    def sample(self, t):
+        if self.pending:
+            self.sampled.extend((kind, t_event, t) for kind, t_event in self.pending if t_event <= t)
+            self.pending = [p for p in self.pending if p[1] > t]
+
+    def flip(self, t):
+        self.flips += 1
+        for kind, t_event, t_sample in self.sampled:
+            self.samples[kind].append((t - t_event, t_sample - t_event, t - t_sample))
+        self.sampled.clear()
+        if self.pending and self.pending[0][1] < t - self.timeout:
+            kept = [p for p in self.pending if p[1] >= t - self.timeout]
+            self.dropped += len(self.pending) - len(kept)
+            self.pending = kept
+
+    def summary(self):
+        """kind -> n, mean and p50/p90/p99 of event to flip, p50 of its two parts; all ms."""
+        result = {}
+        for kind, samples in self.samples.items():
+            if not samples:
+                continue
+            columns = [sorted(column) for column in zip(*samples)]
+            total = columns[0]
+            pick = lambda values, pct: values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+            result[kind] = {'n': len(total), 'mean': sum(total) / len(total) * 1000,
+                            'p50': pick(total, 50), 'p90': pick(total, 90), 'p99': pick(total, 99),
+                            'to_sample_p50': pick(columns[1], 50), 'to_flip_p50': pick(columns[2], 50)}
+        return result
+
+    def report(self):
+        lines = []
+        for kind, stats in self.summary().items():
+            lines.append(f"{kind:<7} n {stats['n']:5}  event->flip p50 {stats['p50']:6.2f}  p90 {stats['p90']:6.2f}"
+                         f"  p99 {stats['p99']:6.2f}  mean {stats['mean']:6.2f} ms  (to sample "
+                         f"{stats['to_sample_p50']:.2f}, sample to flip {stats['to_flip_p50']:.2f})")
+        if self.dropped:
+            lines.append(f"{self.dropped} events never sampled")
+        return lines
+
+def inject_mouse_motion(rate, stop, seed=0):
+    """Post timestamped MOUSEMOTION events at random times, about `rate` a second,
+    until `stop` (a threading.Event) is set; run it on its own thread to measure
+    InputLatency without a person at the mouse."""
+    rng = random.Random(seed)
+    while not stop.wait(rng.expovariate(rate)):
+        pos = (rng.randrange(WIDTH), rng.randrange(HEIGHT))
+        try:
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0),
+                                                 t=time.perf_counter()))
+        except pygame.error:
+            # The window closed first
+            return
+
+class InputCommand:
+    """One frame of player input, independent of the device that produced it.
+
+    aim_angle is the absolute angle (degrees) the ship should turn toward, or
+    None for no aiming; rotate is -1/0/1 for manual turning; shop_pick is an
+    index into GameSimulation.shop_items. wave_delta, unlock and equip carry
+    the debug shortcuts, so they are recorded like any other input; unlock is
+    a shop_items index or 'all'. horde restarts the game in horde mode.
+    """
+    # aim (float32, NaN = no aim), flags, shop pick, wave delta, unlock
+    FORMAT = struct.Struct('<fBBbB')
+    NONE_BYTE, ALL_BYTE = 255, 254
+
+    def __init__(self, aim_angle=None, rotate=0, thrust=False, fire=False,
+                 toggle_shop=False, shop_pick=None, restart=False,
+                 wave_delta=0, unlock=None, equip=False, horde=False):
+        self.aim_angle = aim_angle
+        self.rotate = rotate
+        self.thrust = thrust
+        self.fire = fire
+        self.toggle_shop = toggle_shop
+        self.shop_pick = shop_pick
+        self.restart = restart
+        self.wave_delta = wave_delta
+        self.unlock = unlock
+        self.equip = equip
+        self.horde = horde
+
+    def pack(self):
+        flags = ((1 if self.thrust else 0) | (2 if self.fire else 0) |
+                 (4 if self.rotate < 0 else 0) | (8 if self.rotate > 0 else 0) |
+                 (16 if self.toggle_shop else 0) | (32 if self.restart else 0) |
+                 (64 if self.equip else 0) | (128 if self.horde else 0))
+        unlock = self.unlock
+        return self.FORMAT.pack(math.nan if self.aim_angle is None else self.aim_angle, flags,
+                                self.NONE_BYTE if self.shop_pick is None else self.shop_pick,
+                                max(-128, min(127, self.wave_delta)),
+                                self.NONE_BYTE if unlock is None else self.ALL_BYTE if unlock == 'all' else unlock)
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        aim, flags, pick, wave_delta, unlock = cls.FORMAT.unpack_from(data, offset)
+        return cls(aim_angle=None if aim != aim else aim,
+                   rotate=(1 if flags & 8 else 0) - (1 if flags & 4 else 0),
+                   thrust=bool(flags & 1), fire=bool(flags & 2),
+                   toggle_shop=bool(flags & 16), shop_pick=None if pick == cls.NONE_BYTE else pick,
+                   restart=bool(flags & 32), wave_delta=wave_delta,
+                   unlock=None if unlock == cls.NONE_BYTE else 'all' if unlock == cls.ALL_BYTE else unlock,
+                   equip=bool(flags & 64), horde=bool(flags & 128))
+
+class InputRecorder:
+    """Compact binary log of the InputCommands fed to one GameSimulation.
+
+    The file is a small header (magic, version, seed, starting ship) followed
+    by one InputCommand.FORMAT record per frame, zlib-compressed. Step the
+    simulation with the command record() returns: aim angles are stored as
+    float32, and the live game has to see the same rounded value a replay will.
+    """
+    MAGIC = b'GARC'
+    VERSION = 1
+    HEADER = struct.Struct('<4sBQ12s')
+
+    def __init__(self, seed, ship_type='basic'):
+        self.seed = seed
+        self.ship_type = ship_type
+        self.data = bytearray()
+
+    def __len__(self):
+        return len(self.data) // InputCommand.FORMAT.size
+
+    def record(self, cmd):
+        packed = cmd.pack()
+        self.data += packed
+        return InputCommand.unpack(packed)
+
+    def truncate(self, count):
+        """Forget every command after the first `count`, e.g. after a rewind."""
+        del self.data[count * InputCommand.FORMAT.size:]
+
+    def to_bytes(self):
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, self.ship_type.encode('ascii'))
+        return header + zlib.compress(bytes(self.data), 9)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+class Replay:
+    """A recorded session: seed, starting ship and per-frame InputCommands."""
+    def __init__(self, seed, ship_type, data):
+        self.seed = seed
+        self.ship_type = ship_type
+        self.data = data
+
+    @classmethod
+    def from_bytes(cls, blob):
+        header = InputRecorder.HEADER
+        magic, version, seed, ship = header.unpack_from(blob)
+        if magic != InputRecorder.MAGIC or version != InputRecorder.VERSION:
+            raise ValueError("not a Geometric Asteroids recording (version %d)" % version)
+        return cls(seed, ship.rstrip(b'\0').decode('ascii'), zlib.decompress(blob[header.size:]))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def __len__(self):
+        return len(self.data) // InputCommand.FORMAT.size
+
+    def commands(self):
+        size = InputCommand.FORMAT.size
+        for offset in range(0, len(self.data), size):
+            yield InputCommand.unpack(self.data, offset)
+
+    def new_simulation(self):
+        return GameSimulation(self.ship_type, seed=self.seed)
+
+    def run(self):
+        """Fast-forward the whole recording headless and return the final simulation."""
+        sim = self.new_simulation()
+        for cmd in self.commands():
+            sim.step(cmd)
+        return sim
+
+class SnapshotRing:
+    """Fixed-size byte ring of GameSimulation snapshots, newest last.
+
+    Each push() copies a snapshot into one preallocated bytearray and drops
+    the oldest entries it overwrites, so memory stays at `capacity` however
+    long the game runs. A snapshot that would run past the end starts again
+    at the front. Every entry carries a caller-defined tag and the number of
+    simulation steps it stands for.
+
+    The ring holds about capacity // snapshot size entries: a few thousand
+    for a regular wave, but only around ten for a 5000-enemy horde (about
+    800 KB each). To still span a given number of steps, push only every
+    stride() steps, with that stride as the entry's `steps`.
+    """
+    def __init__(self, capacity=8 * 1024 * 1024):
+        self.buffer = bytearray(capacity)
+        self.entries = deque()  # (tag, start, length, steps), oldest first
+        self.head = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.head = 0
+
+    def stride(self, size, steps):
+        """Steps between pushes of `size`-byte snapshots for the ring to span `steps` steps."""
+        # One entry's worth can be lost to the gap left when a push wraps to the front
+        fit = max(1, len(self.buffer) // max(1, size) - 1)
+        return max(1, -(-steps // fit))
+    
+    def push(self, blob, tag=None, steps=1):
+        """Store `blob`; returns False (and empties the ring) if it can never fit."""
+        size = len(blob)
+        if size > len(self.buffer):
+            self.clear()
+            return False
+        entries = self.entries
+        start = self.head
+        if start + size > len(self.buffer):
+            # Everything between the head and the end is older than what sits at the front
+            while entries and entries[0][1] >= start:
+                entries.popleft()
+            start = 0
+        end = start + size
+        while entries and start <= entries[0][1] < end:
+            entries.popleft()
+        self.buffer[start:end] = blob
+        entries.append((tag, start, size, steps))
+        self.head = end
+        return True
+
+    def pop(self):
+        """Remove the newest snapshot and return it as (blob, tag, steps)."""
+        tag, start, size, steps = self.entries.pop()
+        self.head = start if self.entries else 0
+        return bytes(self.buffer[start:start + size]), tag, steps
+
+    def recent(self, count):
+        """The newest `count` snapshots, oldest first, without removing them."""
+        n = len(self.entries)
+        return [bytes(self.buffer[start:start + size])
+                for _, start, size, _ in (self.entries[i] for i in range(max(0, n - count), n))]
+
+    def covering(self, steps):
+        """The newest snapshots that together stand for at least `steps` steps
+        (or all of them), oldest first, as (blob, steps) pairs."""
+        picked = []
+        for _, start, size, span in reversed(self.entries):
+            if steps <= 0:
+                break
+            picked.append((bytes(self.buffer[start:start + size]), span))
+            steps -= span
+        picked.reverse()
+        return picked
+
+class GameSimulation:
+    """World state and game rules, with no display, input devices or wall clock.
+
+    step() advances exactly one frame from an InputCommand, so the game can run
+    headless as fast as the CPU allows. GeometricAsteroids is a pygame view
+    over an instance of this class.
+    """
+    def __init__(self, ship_type='basic', seed=None):
+        # Every random roll in a game comes from streams seeded here, so a seed
+        # plus the recorded InputCommands reproduce a session exactly
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.particles = ParticleSystem(rng=np.random.default_rng(seed))
+        self.player = Player(ship_type)
+        # Co-op ships after the first (add_player); see `players`
+        self.coop_players = []
+        self.owned_ships = ['basic'] if ship_type == 'basic' else ['basic', ship_type]
+        # Simulation clock: frames stepped and the matching time in milliseconds.
+        # Nothing in the simulation reads the wall clock.
+        self.frame = 0
+        self.ticks = 0
+        # Collision broad-phase grids, rebuilt every tick in update()
+        self.enemy_grid, self.powerup_grid = SpatialHash(), SpatialHash()
+        # Bullets (player and hostile) and powerups are recycled through pools
+        self.bullet_pool, self.powerup_pool = ObjectPool(Bullet), ObjectPool(PowerUp)
+        self.bullets, self.powerups, self.boss_projectiles = [], [], []
+        # Enemy steering moves to the batched NumPy path once a tick has this
+        # many enemies; below it the per-object update() is cheaper
+        self.steering = SteeringBatch()
+        self.batch_steering_min = 1024
+        # A collision pass with fewer (enemy or powerup, bullet or ship) pairs
+        # than this tests every pair directly instead of building its SpatialHash
+        self.grid_min_pairs = 48
+        # Horde mode (start_horde) keeps enemies in a HordeSwarm instead of self.enemies
+        self.horde_target = 3000
+        self.horde_wave_frames = 20 * FPS
+        # Optional PhaseTimer for per-phase update() timings
+        self.phase_timer = None
+        self.reset_game()
+    
+    def reset_game(self):
+        # Preserve ship type if already selected
+        ship_type = self.player.ship_type if hasattr(self, 'player') else 'basic'
+        self.player = Player(ship_type)
+        # Co-op seats keep their ships across a restart
+        self.coop_players = [Player(p.ship_type) for p in self.coop_players]
+        self.place_players()
+        
+        self.bullet_pool.release_all(self.bullets + self.boss_projectiles)
+        self.powerup_pool.release_all(self.powerups)
+        self.bullets, self.enemies, self.powerups, self.boss_projectiles = [], [], [], []
+        self.particles.clear()
+        self.boss = None
+        self.horde = None
+        self.score, self.coins, self.wave = 0, 0, 1
+        self.game_over, self.wave_complete, self.shop_open = False, False, False
+        self.wave_timer = 0
+        
+        # Track owned ships
+        if not hasattr(self, 'owned_ships'):
+            self.owned_ships = ['basic']
+        
+        self.shop_items = [
+            {'id': 'interceptor', 'name': 'Interceptor', 'cost': 1500, 
+             'desc': 'Fast & rapid fire', 'stats': 'Speed: ★★★ | Fire Rate: ★★★'},
+            {'id': 'tank', 'name': 'Heavy Tank', 'cost': 2300, 
+             'desc': 'Slow but powerful', 'stats': 'Damage: ★★★ | Armor: ★★★'},
+            {'id': 'shotgun', 'name': 'Shotgun Ship', 'cost': 3000, 
+             'desc': '5-way spread shot', 'stats': 'Spread: ★★★★★ | Range: ★★'},
+            {'id': 'sniper', 'name': 'Sniper Class', 'cost': 5000, 
+             'desc': 'Pierce & high damage', 'stats': 'Damage: ★★★★★ | Pierce: Yes'}
+        ]
+        self.spawn_wave()
+    
+    def spawn_wave(self):
+        self.wave_complete = False
+        self.boss = None
+        self.bullet_pool.release_all(self.boss_projectiles)
+        self.boss_projectiles = []
+        
+        if self.wave % 4 == 0:
+            self.boss = BossEnemy(WIDTH // 2, -150, self.wave // 4, rng=self.rng)
+            return
+        # Threat-based spawning to create diverse enemy roles and avoid pure crowding
+        # threat points determine how many and which enemies to spawn
+        threat = max(4, 3 + self.wave * 2)
+        max_enemies = min(6 + self.wave * 2, 30)
+
+        weights = self.role_weights_for_wave(self.wave)
+        roles = list(weights.keys())
+        weights_list = [weights[r] for r in roles]
+
+        while threat > 0 and len(self.enemies) < max_enemies:
+            enemy, cost = self.roll_enemy(threat, roles, weights_list)
+            self.enemies.append(enemy)
+            threat -= cost
+    
+    SHAPE_TYPES = ['triangle', 'square', 'pentagon', 'hexagon']
+    # role costs and progressive availability
+    ROLE_COST = {'chaser': 1, 'swarm': 1, 'dasher': 2, 'shield': 3}
+    
+    @staticmethod
+    def role_weights_for_wave(w):
+        # Early waves: mostly chasers and swarmers
+        if w <= 2:
+            return {'chaser': 70, 'swarm': 30, 'dasher': 0, 'shield': 0}
+        if w <= 4:
+            return {'chaser': 50, 'swarm': 25, 'dasher': 25, 'shield': 0}
+        if w <= 7:
+            return {'chaser': 35, 'swarm': 25, 'dasher': 25, 'shield': 15}
+        # later waves: more mixed with shields
+        return {'chaser': 30, 'swarm': 20, 'dasher': 30, 'shield': 20}
+    
+    def roll_enemy(self, threat, roles, weights_list):
+        """Roll one enemy costing at most `threat` points at a random edge. Returns (enemy, cost)."""
+        shape_types = self.SHAPE_TYPES
+        # pick a role according to weights
+        role = self.rng.choices(roles, weights_list, k=1)[0]
+        cost = self.ROLE_COST.get(role, 1)
+        if cost > threat:
+            # fallback to cheaper role
+            role = 'chaser'
+            cost = 1
+
+        # spawn position at a random edge
+        side = self.rng.randint(0, 3)
+        positions = [(self.rng.randint(0, WIDTH), -50), (WIDTH + 50, self.rng.randint(0, HEIGHT)),
+                     (self.rng.randint(0, WIDTH), HEIGHT + 50), (-50, self.rng.randint(0, HEIGHT))]
+        x, y = positions[side]
+
+        # pick a shape type; later waves unlock more complex shapes
+        shape_type = self.rng.choice(shape_types[:min(len(shape_types), 1 + self.wave // 2)])
+
+        # size scaled by role (swarm small, shield big)
+        if role == 'swarm':
+            size = self.rng.randint(14, 24)
+        elif role == 'turret':
+            size = self.rng.randint(22, 36)
+        elif role == 'shield':
+            size = self.rng.randint(30, 44)
+        else:
+            size = self.rng.randint(18, 36)
+
+        return GeometricEnemy(x, y, shape_type, size, role=role, rng=self.rng), cost
+    
+    def start_horde(self, target=None):
+        """Restart as a horde game: no waves to clear, enemies stream in from the
+        edges on a rising threat budget until horde_target are alive."""
+        self.reset_game()
+        self.enemies.clear()
+        self.horde = HordeSwarm()
+        if target:
+            self.horde_target = target
+        self.horde_threat = 0.0
+        self.horde_started = self.frame
+    
+    def spawn_horde(self):
+        # Threat points accrue every tick, faster as the horde wave climbs
+        self.horde_threat += 2 + self.wave * 0.5
+        weights = self.role_weights_for_wave(self.wave)
+        roles = list(weights.keys())
+        weights_list = [weights[r] for r in roles]
+        horde = self.horde
+        while self.horde_threat >= 1 and len(horde) < self.horde_target:
+            enemy, cost = self.roll_enemy(self.horde_threat, roles, weights_list)
+            horde.add(enemy)
+            self.horde_threat -= cost
+        # Don't bank a burst while the horde is full
+        self.horde_threat = min(self.horde_threat, 10.0)
+    
+    def collide_horde(self):
+        horde = self.horde
+        health = horde.health
+        killed = []
+        for b, rows in horde.hits(self.bullets):
+            bullet = self.bullets[b]
+            for row in rows.tolist():
+                if health[row] <= 0:
+                    continue
+                # Pierce check
+                if bullet.pierce and bullet.pierce_count > 0:
+                    bullet.pierce_count -= 1
+                else:
+                    bullet.dead = True
+                health[row] -= bullet.damage
+                if health[row] <= 0:
+                    killed.append(row)
+                if bullet.dead:
+                    break
+        for row in killed:
+            shape_type = horde.SHAPES[horde.shape[row]]
+            sides, color, _, _, coin_value = GeometricEnemy.SHAPES[shape_type]
+            x, y = float(horde.state[row, 0]), float(horde.state[row, 1])
+            self.score += sides * 10
+            self.coins += coin_value
+            self.particles.emit(x, y, color, 8)
+            for child in GeometricEnemy.split_at(x, y, shape_type, int(horde.size[row]), self.rng):
+                horde.add(child)
+            if self.rng.random() < 0.1:
+                self.powerups.append(self.powerup_pool.acquire(x, y, self.rng.choice(['spread', 'rapid', 'life'])))
+        horde.compact()
+    
+    @property
+    def players(self):
+        """Every ship in the game; the first is `player`, whose input drives the
+        shop, restarts and debug actions."""
+        return [self.player] + self.coop_players
+    
+    def live_players(self):
+        return [p for p in self.players if p.lives > 0]
+    
+    def add_player(self, ship_type='basic'):
+        """Seat another co-op ship and return its index in `players`."""
+        if len(self.coop_players) + 1 >= MAX_PLAYERS:
+            raise ValueError("a co-op game holds at most %d players" % MAX_PLAYERS)
+        self.coop_players.append(Player(ship_type))
+        self.place_players()
+        return len(self.coop_players)
+    
+    def place_players(self):
+        # Side by side across the middle of the screen; a lone ship stays centred
+        players = self.players
+        for i, player in enumerate(players):
+            player.x = player.prev_x = WIDTH // 2 + (i - (len(players) - 1) / 2) * 60
+    
+    @staticmethod
+    def nearest_player(players, x, y):
+        if len(players) == 1:
+            return players[0].x, players[0].y
+        player = min(players, key=lambda p: (p.x - x) ** 2 + (p.y - y) ** 2)
+        return player.x, player.y
+    
+    def hurt_player(self, player, invulnerable, sparks):
+        player.lives -= 1
+        player.invulnerable = invulnerable
+        self.particles.emit(player.x, player.y, CYAN, sparks)
+        if player.lives <= 0 and not self.live_players():
+            self.game_over = True
+    
+    def equip_ship(self, ship_id):
+        old_lives = self.player.lives
+        self.player = Player(ship_id)
+        self.player.lives = old_lives
+    
+    def select_ship(self, index):
+        """Shop click on card `index`: equip if owned, otherwise buy and equip if affordable."""
+        item = self.shop_items[index]
+        ship_id = item['id']
+        if ship_id in self.owned_ships:
+            self.equip_ship(ship_id)
+        elif self.coins >= item['cost']:
+            self.coins -= item['cost']
+            self.owned_ships.append(ship_id)
+            self.equip_ship(ship_id)
+    
+    def unlock_ship(self, ship_id, equip=False):
+        if ship_id not in self.owned_ships:
+            self.owned_ships.append(ship_id)
+        if equip:
+            self.equip_ship(ship_id)
+    
+    def change_wave(self, delta):
+        self.wave = max(1, self.wave + delta)
+        if self.horde is None:
+            self.spawn_wave()
+    
+    def apply_input(self, cmd, player=None):
+        if self.shop_open: return
+        player = player or self.player
+        self.steer_player(player, cmd)
+        if cmd.fire:
+            if player.can_shoot(): self.shoot(player)
+    
+    @staticmethod
+    def steer_player(player, cmd):
+        """The turning and thrust part of apply_input(), which co-op clients also
+        run to predict their own ship."""
+        if cmd.aim_angle is not None:
+            angle_diff = cmd.aim_angle - player.angle
+            while angle_diff > 180: angle_diff -= 360
+            while angle_diff < -180: angle_diff += 360
+            
+            if abs(angle_diff) > 2:
+                player.rotate(1 if angle_diff > 0 else -1)
+        
+        if cmd.rotate: player.rotate(cmd.rotate)
+        if cmd.thrust: player.thrust()
+    
+    def step(self, cmd):
+        """Advance one frame. Returns False when the game is over and nothing ran.
+        
+        In co-op `cmd` is a list with one InputCommand per ship in `players`;
+        game-wide actions (restart, shop, debug keys) come from the first.
+        """
+        cmds = cmd if isinstance(cmd, (list, tuple)) else (cmd,)
+        cmd = cmds[0]
+        if cmd.restart and self.game_over:
+            if self.horde is not None:
+                self.start_horde()
+            else:
+                self.reset_game()
+        if cmd.horde:
+            self.start_horde()
+        if cmd.wave_delta:
+            self.change_wave(cmd.wave_delta)
+        if cmd.unlock == 'all':
+            for item in self.shop_items:
+                self.unlock_ship(item['id'])
+        elif cmd.unlock is not None:
+            self.unlock_ship(self.shop_items[cmd.unlock]['id'], equip=cmd.equip)
+        if self.game_over:
+            return False
+        if cmd.shop_pick is not None and self.shop_open:
+            self.select_ship(cmd.shop_pick)
+        if cmd.toggle_shop:
+            self.shop_open = not self.shop_open
+        for player, player_cmd in zip(self.players, cmds):
+            if player.lives > 0:
+                self.apply_input(player_cmd, player)
+        self.update()
+        return True
+    
+    def shoot(self, player=None):
+        player = player or self.player
+        delays = {'spread': 10, 'rapid': 3, 'normal': player.default_shoot_delay}
+        player.shoot_delay = delays.get(player.weapon_type, player.default_shoot_delay)
+        player.shoot()
+        new_bullet = self.bullet_pool.acquire
+        
+        # Ship ability-based shooting
+        if player.special_ability == 'spread' or player.weapon_type == 'spread':
+            # 5-way spread
+            for offset in [-30, -15, 0, 15, 30]:
+                self.bullets.append(new_bullet(player.x, player.y, player.angle + offset,
+                                               9, 'player', player.damage))
+        elif player.special_ability == 'heavy':
+            # Single heavy shot
+            bullet = new_bullet(player.x, player.y, player.angle, 8, 'player', player.damage)
+            bullet.radius = 5
+            self.bullets.append(bullet)
+        elif player.special_ability == 'pierce':
+            # Piercing bullet
+            bullet = new_bullet(player.x, player.y, player.angle, 14, 'player', player.damage)
+            bullet.pierce = True
+            bullet.pierce_count = 3
+            self.bullets.append(bullet)
+        else:
+            # Normal or rapid
+            speed = 15 if player.weapon_type == 'rapid' or player.special_ability == 'rapid' else 10
+            self.bullets.append(new_bullet(player.x, player.y, player.angle,
+                                           speed, 'player', player.damage))
+    
+    @staticmethod
+    def compact(lst, pool=None):
+        """Drop the entities marked dead this tick in one order-preserving pass."""
+        if any(item.dead for item in lst):
+            if pool is not None:
+                pool.release_all([item for item in lst if item.dead])
+            lst[:] = [item for item in lst if not item.dead]
+    
+    # Snapshot layout: header, owned ship codes, each player, random state, then
+    # each entity list as a run of doubles in its *_FIELDS order, and finally
+    # the particle and horde arrays as raw bytes. Snapshots are taken between
+    # steps, when nothing is marked dead and every prev_x/prev_y is about to
+    # be overwritten by update(), so neither is stored
+    SNAP_HEADER = struct.Struct('<IIqqiiBBBBHHHHII')
+    SNAP_PLAYER = struct.Struct('<7d5iBB')
+    SNAP_RNG = struct.Struct('<625IBd')
+    SNAP_NP_RNG = struct.Struct('<16s16sBI')
+    SNAP_HORDE = struct.Struct('<dII')
+    ENEMY_FIELDS = ('x', 'y', 'angle', 'rotation_speed', 'speed', 'health', 'vel_x', 'vel_y', 'dash_speed', 'size',
+                    'sides', 'role_code', 'zig_timer', 'dash_timer', '_dash_ticks', 'dash_duration', 'shield_timer',
+                    'is_dashing', 'shield_active')
+    BOSS_FIELDS = ('x', 'y', 'angle', 'rotation_speed', 'health', 'minion_timer', 'attack_timer', 'boss_index')
+    BULLET_FIELDS = ('x', 'y', 'vel_x', 'vel_y', 'lifetime', 'radius', 'damage', 'pierce', 'pierce_count')
+    # Boss projectiles always have the default radius, damage and no pierce
+    PROJECTILE_FIELDS = ('x', 'y', 'vel_x', 'vel_y', 'lifetime')
+    POWERUP_FIELDS = ('x', 'y', 'lifetime')
+    POWERUP_TYPES = ('spread', 'rapid', 'life')
+    WEAPON_TYPES = ('normal', 'spread', 'rapid')
+    _enemy_values = attrgetter(*ENEMY_FIELDS)
+    _boss_values = attrgetter(*BOSS_FIELDS)
+    _bullet_values = attrgetter(*BULLET_FIELDS)
+    _projectile_values = attrgetter(*PROJECTILE_FIELDS)
+    _powerup_values = attrgetter(*POWERUP_FIELDS)
+    
+    @staticmethod
+    def _pack_doubles(getter, objs):
+        values = list(chain.from_iterable(map(getter, objs)))
+        return struct.pack('<%dd' % len(values), *values)
+    
+    def snapshot(self):
+        """The whole world state as bytes, for restore(); packed with struct, no pickling."""
+        players = self.players
+        horde = self.horde
+        particles = self.particles
+        flags = ((1 if self.wave_complete else 0) | (2 if self.game_over else 0) | (4 if self.shop_open else 0) |
+                 (8 if self.boss else 0) | (16 if horde is not None else 0))
+        chunks = [
+            self.SNAP_HEADER.pack(self.frame, self.ticks, self.score, self.coins, self.wave, self.wave_timer, flags,
+                                  len(players), len(self.owned_ships), 0, len(self.enemies),
+                                  len(self.bullets), len(self.boss_projectiles), len(self.powerups),
+                                  particles.count, len(horde) if horde is not None else 0),
+            bytes(SHIP_TYPES.index(ship) for ship in self.owned_ships),
+        ]
+        for p in players:
+            chunks.append(self.SNAP_PLAYER.pack(p.x, p.y, p.prev_x, p.prev_y, p.angle, p.vel_x, p.vel_y, p.lives,
+                                                p.invulnerable, p.shoot_cooldown, p.shoot_delay, p.weapon_timer,
+                                                self.WEAPON_TYPES.index(p.weapon_type),
+                                                SHIP_TYPES.index(p.ship_type)))
+        version, state, gauss = self.rng.getstate()
+        chunks.append(self.SNAP_RNG.pack(*state, gauss is not None, gauss or 0.0))
+        np_state = particles.rng.bit_generator.state
+        chunks.append(self.SNAP_NP_RNG.pack(np_state['state']['state'].to_bytes(16, 'little'),
+                                            np_state['state']['inc'].to_bytes(16, 'little'),
+                                            np_state['has_uint32'], np_state['uinteger']))
+        if self.boss:
+            chunks.append(self._pack_doubles(self._boss_values, (self.boss,)))
+        chunks.append(self._pack_doubles(self._enemy_values, self.enemies))
+        chunks.append(self._pack_doubles(self._bullet_values, self.bullets))
+        chunks.append(self._pack_doubles(self._projectile_values, self.boss_projectiles))
+        chunks.append(self._pack_doubles(self._powerup_values, self.powerups))
+        chunks.append(bytes(self.POWERUP_TYPES.index(powerup.type) for powerup in self.powerups))
+        n = particles.count
+        for arr in (particles.pos, particles.vel, particles.life, particles.size, particles.color):
+            chunks.append(arr[:n].tobytes())
+        if horde is not None:
+            n = horde.count
+            chunks.append(self.SNAP_HORDE.pack(self.horde_threat, self.horde_started, self.horde_target))
+            for arr in (horde.state, horde.prev, horde.size, horde.health, horde.shape):
+                chunks.append(arr[:n].tobytes())
+        return b''.join(chunks)
+    
+    def restore(self, blob):
+        """Put the world back to a snapshot() of this game; stepping on from it
+        replays exactly what followed the snapshot."""
+        view = memoryview(blob)
+        (self.frame, self.ticks, self.score, self.coins, self.wave, self.wave_timer, flags, n_players, n_owned, _,
+         n_enemies, n_bullets, n_projectiles, n_powerups, n_particles, n_horde) = self.SNAP_HEADER.unpack_from(view)
+        offset = self.SNAP_HEADER.size
+        self.wave_complete, self.game_over, self.shop_open = bool(flags & 1), bool(flags & 2), bool(flags & 4)
+        self.owned_ships = [SHIP_TYPES[code] for code in view[offset:offset + n_owned]]
+        offset += n_owned
+        
+        players = []
+        for _ in range(n_players):
+            values = self.SNAP_PLAYER.unpack_from(view, offset)
+            p = Player(SHIP_TYPES[values[-1]])
+            (p.x, p.y, p.prev_x, p.prev_y, p.angle, p.vel_x, p.vel_y, p.lives, p.invulnerable, p.shoot_cooldown,
+             p.shoot_delay, p.weapon_timer, weapon, _) = values
+            p.weapon_type = self.WEAPON_TYPES[weapon]
+            players.append(p)
+            offset += self.SNAP_PLAYER.size
+        self.player, *self.coop_players = players
+        
+        *state, has_gauss, gauss = self.SNAP_RNG.unpack_from(view, offset)
+        rng_state = (3, tuple(state), gauss if has_gauss else None)
+        offset += self.SNAP_RNG.size
+        np_state, inc, has_uint32, uinteger = self.SNAP_NP_RNG.unpack_from(view, offset)
+        offset += self.SNAP_NP_RNG.size
+        
+        def doubles(count, fields):
+            nonlocal offset
+            k = len(fields)
+            values = struct.unpack_from('<%dd' % (count * k), view, offset)
+            offset += 8 * count * k
+            return [values[i:i + k] for i in range(0, count * k, k)]
+        
+        self.boss = None
+        if flags & 8:
+            (values,) = doubles(1, self.BOSS_FIELDS)
+            boss = self.boss = BossEnemy(values[0], values[1], int(values[-1]), rng=self.rng)
+            for name, value in zip(self.BOSS_FIELDS, values):
+                setattr(boss, name, value)
+            boss.prev_x, boss.prev_y = boss.x, boss.y
+            boss.minion_timer, boss.attack_timer, boss.boss_index = int(boss.minion_timer), int(boss.attack_timer), int(boss.boss_index)
+        
+        role_names = ('chaser', 'swarm', 'dasher', 'shield')
+        self.enemies = []
+        for values in doubles(n_enemies, self.ENEMY_FIELDS):
+            enemy = GeometricEnemy.__new__(GeometricEnemy)
+            for name, value in zip(self.ENEMY_FIELDS, values):
+                setattr(enemy, name, value)
+            enemy.rng = self.rng
+            enemy.prev_x, enemy.prev_y, enemy.dead = enemy.x, enemy.y, False
+            for name in ('size', 'sides', 'role_code', 'zig_timer', 'dash_timer', '_dash_ticks', 'dash_duration',
+                         'shield_timer'):
+                setattr(enemy, name, int(getattr(enemy, name)))
+            enemy.is_dashing, enemy.shield_active = bool(enemy.is_dashing), bool(enemy.shield_active)
+            enemy.shape_type = self.SHAPE_TYPES[enemy.sides - 3]
+            _, enemy.color, _, _, enemy.coin_value = GeometricEnemy.SHAPES[enemy.shape_type]
+            enemy.role = role_names[enemy.role_code]
+            self.enemies.append(enemy)
+        self.steering.invalidate()
+        
+        self.bullet_pool.release_all(self.bullets + self.boss_projectiles)
+        self.bullets = []
+        for x, y, vel_x, vel_y, lifetime, radius, damage, pierce, pierce_count in doubles(n_bullets,
+                                                                                          self.BULLET_FIELDS):
+            bullet = self.bullet_pool.acquire(x, y, 0, 0, 'player', damage)
+            bullet.vel_x, bullet.vel_y, bullet.lifetime, bullet.radius = vel_x, vel_y, int(lifetime), int(radius)
+            bullet.pierce, bullet.pierce_count = bool(pierce), int(pierce_count)
+            self.bullets.append(bullet)
+        self.boss_projectiles = []
+        for x, y, vel_x, vel_y, lifetime in doubles(n_projectiles, self.PROJECTILE_FIELDS):
+            bullet = self.bullet_pool.acquire(x, y, 0, 0, 'boss')
+            bullet.vel_x, bullet.vel_y, bullet.lifetime = vel_x, vel_y, int(lifetime)
+            self.boss_projectiles.append(bullet)
+        
+        self.powerup_pool.release_all(self.powerups)
+        rows = doubles(n_powerups, self.POWERUP_FIELDS)
+        self.powerups = []
+        for (x, y, lifetime), code in zip(rows, view[offset:offset + n_powerups]):
+            powerup = self.powerup_pool.acquire(x, y, self.POWERUP_TYPES[code])
+            powerup.lifetime = int(lifetime)
+            self.powerups.append(powerup)
+        offset += n_powerups
+        
+        def array_into(arr, count):
+            nonlocal offset
+            row = arr[:1]
+            size = count * row.nbytes
+            arr[:count] = np.frombuffer(view, arr.dtype, count * row.size, offset).reshape((count,) + arr.shape[1:])
+            offset += size
+        
+        particles = self.particles
+        if n_particles > len(particles.life):
+            particles._grow(n_particles)
+        for arr in (particles.pos, particles.vel, particles.life, particles.size, particles.color):
+            array_into(arr, n_particles)
+        particles.count = n_particles
+        bit_generator = particles.rng.bit_generator
+        bit_generator.state = {'bit_generator': bit_generator.state['bit_generator'],
+                               'state': {'state': int.from_bytes(np_state, 'little'),
+                                         'inc': int.from_bytes(inc, 'little')},
+                               'has_uint32': has_uint32, 'uinteger': uinteger}
+        
+        self.horde = None
+        if flags & 16:
+            self.horde_threat, self.horde_started, self.horde_target = self.SNAP_HORDE.unpack_from(view, offset)
+            offset += self.SNAP_HORDE.size
+            horde = self.horde = HordeSwarm(max(n_horde, 1024))
+            for arr in (horde.state, horde.prev, horde.size, horde.health, horde.shape):
+                array_into(arr, n_horde)
+            horde.count = n_horde
+        # Last, since rebuilding the boss above drew from the stream
+        self.rng.setstate(rng_state)
+    
+    def update(self):
+        if self.shop_open: return
+        timer = self.phase_timer
+        if timer: timer.start()
+        self.frame += 1
+        self.ticks = self.frame * 1000 // FPS
+        # Ships still in play this tick; enemies and the boss go for the nearest
+        players = self.live_players() or [self.player]
+        for player in players:
+            player.update()
+        targets = [(player.x, player.y) for player in players]
+        
+        for lst, pool in [(self.bullets, self.bullet_pool), (self.boss_projectiles, self.bullet_pool),
+                          (self.powerups, self.powerup_pool)]:
+            alive = []
+            for item in lst:
+                item.update()
+                if item.is_alive(): alive.append(item)
+                else: pool.release(item)
+            lst[:] = alive
+        self.particles.update()
+        if timer: timer.lap('update.entities')
+        
+        if len(self.enemies) >= self.batch_steering_min:
+            self.steering.update(self.enemies, targets, self.ticks)
+        else:
+            self.steering.invalidate()
+            for enemy in self.enemies:
+                tx, ty = targets[0] if len(targets) == 1 else self.nearest_player(players, enemy.x, enemy.y)
+                spawned = enemy.update(tx, ty, self.ticks)
+                if spawned:
+                    # enemy-fired bullets are handled with boss_projectiles list (hostile projectiles)
+                    self.boss_projectiles.extend(spawned)
+        if self.horde is not None:
+            self.spawn_horde()
+            self.horde.steer(targets, self.ticks, self.rng)
+        if timer: timer.lap('update.enemies')
+        
+        if self.boss:
+            tx, ty = self.nearest_player(players, self.boss.x, self.boss.y)
+            self.boss.update(tx, ty, self.enemies, self.boss_projectiles, self.bullet_pool)
+        if timer: timer.lap('update.boss')
+        
+        # Boss collision (a single target, so every bullet is swept against it directly)
+        if self.boss:
+            for bullet in self.bullets:
+                if swept_hit(bullet, self.boss, self.boss.size):
+                    bullet.dead = True
+                    if self.boss.hit(bullet.damage):
+                        self.score += 1200 + (self.boss.boss_index * 800)
+                        self.coins += 200 + (self.boss.boss_index * 60)
+                        self.wave += 1
+                        self.wave_complete, self.wave_timer = True, 200
+                        self.particles.emit(self.boss.x, self.boss.y, PURPLE, 60, jitter=30)
+                        self.powerups.append(self.powerup_pool.acquire(self.boss.x, self.boss.y, self.rng.choice(['spread', 'rapid', 'life'])))
+                        self.boss = None
+                        self.bullet_pool.release_all(self.boss_projectiles)
+                        self.boss_projectiles = []
+                        break
+        
+        if timer: timer.lap('collide.boss')
+        
+        # Enemy collision
+        enemies = self.enemies
+        grid = self.enemy_grid if len(enemies) * (len(self.bullets) + len(players)) >= self.grid_min_pairs else None
+        if grid is not None:
+            grid.clear()
+            # Enemies are inserted with room for where they were before this step,
+            # bullets look up every cell along their path
+            for enemy in enemies:
+                grid.insert(enemy, enemy.x, enemy.y, enemy.size + step_reach(enemy))
+        for bullet in self.bullets:
+            if bullet.dead: continue
+            if grid is None:
+                # Every enemy in list order, the order the grid would return them in
+                candidates = [(i, enemy) for i, enemy in enumerate(enemies) if not enemy.dead]
+            else:
+                candidates = grid.query_segment(bullet.prev_x, bullet.prev_y, bullet.vel_x, bullet.vel_y)
+                if wrapped(bullet):
+                    # Also look where it reappeared
+                    found = dict(candidates)
+                    found.update(grid.query_point(bullet.x, bullet.y))
+                    candidates = sorted(found.items())
+            for entry in candidates:
+                enemy = entry[1]
+                if swept_hit(bullet, enemy, enemy.size):
+                    # Pierce check
+                    can_remove = True
+                    if bullet.pierce and bullet.pierce_count > 0:
+                        bullet.pierce_count -= 1
+                        can_remove = False
+                    
+                    if can_remove:
+                        bullet.dead = True
+                    
+                    if enemy.hit(bullet.damage):
+                        self.score += enemy.sides * 10
+                        self.coins += enemy.coin_value
+                        self.particles.emit(enemy.x, enemy.y, enemy.color, 8)
+                        enemy.dead = True
+                        # Children go on the end of the list, where compaction keeps them
+                        children = enemy.split()
+                        enemies.extend(children)
+                        if grid is not None:
+                            grid.remove(entry, enemy.x, enemy.y, enemy.size + step_reach(enemy))
+                            for child in children:
+                                grid.insert(child, child.x, child.y, child.size)
+                        if self.rng.random() < 0.1:
+                            self.powerups.append(self.powerup_pool.acquire(enemy.x, enemy.y, self.rng.choice(['spread', 'rapid', 'life'])))
+                    
+                    if can_remove:
+                        break
+        if self.horde is not None:
+            self.collide_horde()
+        
+        if timer: timer.lap('collide.enemies')
+        
+        # Boss projectile collision (swept against each ship, like the boss above)
+        for player in players:
+            for bproj in self.boss_projectiles:
+                if bproj.dead:
+                    continue
+                if swept_hit(bproj, player, player.radius + bproj.radius):
+                    bproj.dead = True
+                    if player.invulnerable == 0:
+                        self.hurt_player(player, 100, 18)
+                    break
+        
+        if timer: timer.lap('collide.projectiles')
+        
+        # Player-enemy collision
+        for player in players:
+            if player.invulnerable == 0:
+                near = (enemy for enemy in enemies if not enemy.dead) if grid is None else \
+                    (enemy for _, enemy in grid.query_circle(player.x, player.y, player.radius))
+                for enemy in near:
+                    if math.sqrt((player.x - enemy.x)**2 + (player.y - enemy.y)**2) < enemy.size + player.radius:
+                        self.hurt_player(player, 120, 20)
+                        break
+            if player.invulnerable == 0 and self.horde is not None:
+                if self.horde.touching(player.x, player.y, player.radius) >= 0:
+                    self.hurt_player(player, 120, 20)
+        
+        if timer: timer.lap('collide.player')
+        
+        # Powerup collision
+        grid = self.powerup_grid if len(self.powerups) * len(players) >= self.grid_min_pairs else None
+        if grid is not None:
+            grid.clear()
+            for powerup in self.powerups:
+                grid.insert(powerup, powerup.x, powerup.y, powerup.radius)
+        for player in players:
+            near = self.powerups if grid is None else \
+                [powerup for _, powerup in grid.query_circle(player.x, player.y, player.radius)]
+            for powerup in near:
+                if powerup.dead: continue
+                if math.sqrt((player.x - powerup.x)**2 + (player.y - powerup.y)**2) < powerup.radius + player.radius:
+                    powerup.dead = True
+                    if powerup.type == 'life':
+                        player.lives += 1
+                        self.score += 100
+                    else:
+                        player.weapon_type = powerup.type
+                        player.weapon_timer = 300
+                    self.particles.emit(powerup.x, powerup.y, powerup.color, 15)
+        
+        self.compact(self.bullets, self.bullet_pool)
+        self.compact(self.enemies)
+        self.compact(self.boss_projectiles, self.bullet_pool)
+        self.compact(self.powerups, self.powerup_pool)
+        if timer: timer.lap('collide.powerups')
+        
+        # Wave completion; horde mode has none, its wave number climbs with time instead
+        if self.horde is not None:
+            if (self.frame - self.horde_started) % self.horde_wave_frames == 0:
+                self.wave += 1
+        elif not self.boss and not self.enemies and not self.boss_projectiles and not self.wave_complete:
+            self.wave_complete, self.wave_timer = True, 120
+            self.wave += 1
+            self.score += self.wave * 100
+        
+        if self.wave_complete:
+            self.wave_timer -= 1
+            if self.wave_timer <= 0: self.spawn_wave()
+        if timer: timer.lap('update.wave')
+    
+
+class GeometricAsteroids:
+    """Pygame window, input devices and renderer for a GameSimulation."""
+    def __init__(self, sim=None, vsync=False):
+        # Only the subsystems the view uses; audio and joysticks stay off
+        pygame.display.init()
+        pygame.font.init()
+        # With vsync, flip() waits for the display's next refresh (pygame only
+        # offers it to SCALED or OPENGL windows)
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED if vsync else 0, vsync=int(vsync))
+        self.vsync = vsync
+        pygame.display.set_caption("Geometric Asteroids")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.prev_s = False
+        # Debug helpers: enable keys to jump waves and unlock ships for testing
+        self.debug_mode = True
+        self.sim = sim or GameSimulation()
+        # Optional InputRecorder that logs every command fed to the simulation
+        self.recorder = None
+        # Optional PhaseTimer for per-layer draw() timings
+        self.phase_timer = None
+        # Pre-rendered enemy and boss polygons; None draws them as vectors every frame
+        self.sprites = SpriteCache()
+        
+        # Static layers built once: grid background and translucent HUD panels
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(BLACK)
+        for x in range(0, WIDTH, 50):
+            pygame.draw.line(self.background, (20, 20, 40), (x, 0), (x, HEIGHT), 1)
+        for y in range(0, HEIGHT, 50):
+            pygame.draw.line(self.background, (20, 20, 40), (0, y), (WIDTH, y), 1)
+        self.background = self.background.convert()
+        self.hud_panel = pygame.Surface((220, 170))
+        self.hud_panel.set_alpha(180)
+        self.hud_panel.fill(BLACK)
+        self.weapon_panel = pygame.Surface((180, 60))
+        self.weapon_panel.set_alpha(180)
+        self.weapon_panel.fill(BLACK)
+        # slot -> (text, color, rendered surface); re-rendered only when text or color change
+        self.text_cache = {}
+        
+        # Menu screens: the shop box and its cards' hit-rects are laid out once,
+        # and a composed shop or game-over frame is kept in menu_frame and reused
+        # while menu_key (the state it shows) stays the same
+        self.shop_dim = pygame.Surface((WIDTH, HEIGHT))
+        self.shop_dim.set_alpha(200)
+        self.shop_dim.fill((6, 6, 8))
+        self.game_over_dim = pygame.Surface((WIDTH, HEIGHT))
+        self.game_over_dim.fill(BLACK)
+        self.shop_box = pygame.Rect(WIDTH // 2 - 300, HEIGHT // 2 - 250, 600, 500)
+        card_w, card_h, gap = self.shop_box.w - 32, 85, 16
+        self.shop_rects = [(pygame.Rect(self.shop_box.x + gap, self.shop_box.y + 110 + idx * (card_h + gap),
+                                        card_w, card_h), item)
+                           for idx, item in enumerate(self.sim.shop_items)]
+        self.menu_frame = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.menu_key = None
+        
+        # Dirty-rectangle mode: restore and push only the regions drawn last frame
+        # and this frame, falling back to a full flip when that covers too much
+        self.dirty_rects = False
+        self.dirty_full_fraction = 0.4
+        self.prev_rects = []
+        self.full_redraw = True
+        
+        # run() steps the simulation at a fixed FPS and renders at render_fps,
+        # drawing moving entities interpolated between the last two steps
+        self.render_fps = FPS
+        self.max_catch_up = 5
+        self.interpolate = True
+        self.prev_positions = {}
+        # Update + draw time of the last frame, without the wait for the next one
+        self.frame_ms = 0.0
+        # Late input sampling: run() sleeps before pumping events rather than
+        # after the flip, waking just in time to read input, step and draw
+        # before the next flip is due (input_margin seconds to spare). Without
+        # vsync both orders show input equally soon; with it, sampling right
+        # after a blocking flip shows input a whole refresh later.
+        self.late_input = False
+        self.input_margin = 0.001
+        self.next_flip = None
+        # Recent times from pumping events to calling flip, which a vsynced flip can then block
+        self.frame_work = deque(maxlen=FPS)
+        self.flip_start = 0.0
+        # Optional InputLatency fed by run()
+        self.latency = None
+        self.latency_summary = []
+        # Position of the last MOUSEMOTION run() pumped; None reads the mouse
+        self.motion_pos = None
+        # Lowers particle counts, enemy detail and HUD blending while frames run
+        # over budget (see update_quality); None always renders at full detail
+        self.quality = QualityGovernor()
+        
+        # Debug frame profiler: F3 shows the graph, F4 logs every frame to
+        # profile_log_path; it is attached as phase_timer while either is on
+        self.profiler = None
+        self.show_profiler = False
+        self.profile_log_path = 'frame_profile.csv'
+        self.profiler_graph = None
+        self.profiler_drawn = 0
+        self.profiler_summary = []
+        
+        # A snapshot of the simulation before every step (every
+        # history_stride steps once snapshots grow large, as in a big horde):
+        # holding R rewinds through them, and on game over the last
+        # KILL_CAM_FRAMES steps replay at half speed behind the game-over screen
+        self.history = SnapshotRing()
+        self.history_stride = 1
+        self.history_wait = 0
+        self.rewind_enabled = True
+        self.kill_cam = None
+        self.kill_cam_ends = []
+        self.kill_cam_sim = None
+        self.kill_cam_pos = 0.0
+        self.kill_cam_shown = None
+    
+    def read_input(self, cmd):
+        """Fill `cmd` from the keyboard and mouse state for this frame."""
+        sim = self.sim
+        keys = pygame.key.get_pressed()
+        cmd.toggle_shop = keys[pygame.K_s] and not self.prev_s
+        self.prev_s = keys[pygame.K_s]
+        # Input is ignored while the shop is open, so skip polling the rest
+        if sim.shop_open != bool(cmd.toggle_shop): return cmd
+        mouse_pos, mouse_buttons = self.mouse_pos(), pygame.mouse.get_pressed()
+        
+        dx, dy = mouse_pos[0] - sim.player.x, mouse_pos[1] - sim.player.y
+        cmd.aim_angle = math.degrees(math.atan2(dy, dx))
+        cmd.rotate = (1 if keys[pygame.K_RIGHT] else 0) - (1 if keys[pygame.K_LEFT] else 0)
+        cmd.thrust = bool(keys[pygame.K_UP] or keys[pygame.K_w] or mouse_buttons[2])
+        cmd.fire = bool(mouse_buttons[0] or keys[pygame.K_SPACE])
+        return cmd
+    
+    def mouse_pos(self):
+        # The same as pygame.mouse.get_pos() once a motion event has been pumped,
+        # but also follows injected events (inject_mouse_motion)
+        return self.motion_pos or pygame.mouse.get_pos()
+    
+    def wait_for_input(self):
+        """Late input sampling: sleep until the next flip is due in the 95th
+        percentile of recent frame_work times plus input_margin."""
+        period = 1 / self.render_fps
+        now = time.perf_counter()
+        work = sorted(self.frame_work)[len(self.frame_work) * 95 // 100] if self.frame_work else period / 2
+        work += self.input_margin
+        due = self.next_flip + period if self.next_flip is not None else now + work
+        if due - work < now:
+            # Fell behind (or just started): restart the schedule from now
+            due = now + work
+        self.next_flip = due
+        wake = due - work
+        if wake - now > 0.002:
+            time.sleep(wake - now - 0.002)
+        # time.sleep() can overshoot by a millisecond or more, so spin the rest
+        while time.perf_counter() < wake:
+            pass
+    
+    def render_text(self, slot, text, color, font=None):
+        cached = self.text_cache.get(slot)
+        if cached is not None and cached[0] == text and cached[1] == color:
+            return cached[2]
+        surface = (font or self.small_font).render(text, True, color)
+        self.text_cache[slot] = (text, color, surface)
+        return surface
+    
+    def update_quality(self, frame_ms):
+        """Feed the governor one frame time and apply its current level."""
+        quality = self.quality
+        if quality is None:
+            return
+        if quality.update(frame_ms):
+            alpha = 180 if quality.hud_alpha else None
+            self.hud_panel.set_alpha(alpha)
+            self.weapon_panel.set_alpha(alpha)
+        self.sim.particles.emit_scale = quality.particle_scale
+    
+    def moving_entities(self):
+        sim = self.sim
+        return chain(sim.players, (sim.boss,) if sim.boss else (), sim.enemies, sim.bullets,
+                     sim.boss_projectiles)
+    
+    def snapshot_positions(self):
+        """Remember entity positions before the last simulation step of a frame."""
+        self.prev_positions = {id(obj): (obj, obj.x, obj.y) for obj in self.moving_entities()}
+    
+    def apply_interpolation(self, alpha):
+        """Move entities `alpha` of the way from their snapshot to their current position.
+        
+        Returns what restore_interpolation() needs to put them back. Entities that
+        wrapped around the screen, or pooled objects reused for something new,
+        jump further than MAX_STEP_MOVE and are left where they are.
+        """
+        moved = []
+        prev = self.prev_positions
+        for obj in self.moving_entities():
+            p = prev.get(id(obj))
+            if p is None or p[0] is not obj:
+                continue
+            x, y = obj.x, obj.y
+            dx, dy = x - p[1], y - p[2]
+            if -MAX_STEP_MOVE < dx < MAX_STEP_MOVE and -MAX_STEP_MOVE < dy < MAX_STEP_MOVE:
+                moved.append((obj, x, y))
+                obj.x, obj.y = p[1] + dx * alpha, p[2] + dy * alpha
+        particles = self.sim.particles
+        n = particles.count
+        pos = particles.pos[:n].copy()
+        # Particles emitted during the last step have not moved yet
+        stepped = particles.life[:n] < particles.LIFETIME
+        particles.pos[:n][stepped] -= particles.vel[:n][stepped] * ((1 - alpha) / particles.DAMPING)
+        # Horde rows keep their position before the last step alongside the current one
+        horde = self.sim.horde
+        horde_pos = None
+        if horde is not None and horde.count:
+            n = horde.count
+            horde_pos = horde.state[:n, :2].copy()
+            delta = horde_pos - horde.prev[:n]
+            still = (np.abs(delta) < MAX_STEP_MOVE).all(axis=1)
+            horde.state[:n, :2][still] -= delta[still] * (1 - alpha)
+        return moved, pos, horde_pos
+    
+    def restore_interpolation(self, state):
+        moved, pos, horde_pos = state
+        for obj, x, y in moved:
+            obj.x, obj.y = x, y
+        self.sim.particles.pos[:len(pos)] = pos
+        if horde_pos is not None:
+            self.sim.horde.state[:len(horde_pos), :2] = horde_pos
+    
+    def draw(self, alpha=1.0):
+        """Render the current state; alpha < 1 draws moving entities interpolated
+        that far between the previous and the current simulation step."""
+        sim = self.sim
+        timer = self.phase_timer
+        if timer: timer.start()
+        # The horde covers too much of the screen for dirty rectangles to pay off
+        partial = self.dirty_rects and not self.full_redraw and not sim.shop_open and sim.horde is None
+        menu_key = self.shop_key() if sim.shop_open else None
+        if menu_key is not None and menu_key == self.menu_key:
+            # Nothing moves while the shop is open: reuse the composed frame
+            self.screen.blit(self.menu_frame, (0, 0))
+            interpolated, ui_rects = None, []
+            if timer: timer.lap('draw.background')
+        else:
+            interpolated = self.apply_interpolation(alpha) if alpha < 1 else None
+            ui_rects = self.draw_scene(partial, timer)
+            if sim.shop_open:
+                self.draw_shop_overlay()
+                self.menu_frame.blit(self.screen, (0, 0))
+            self.menu_key = menu_key
+        
+        # Debug HUD
+        if getattr(self, 'debug_mode', False):
+            dbg_lines = [
+                "Debug: Ctrl+Up/Ctrl+Down change wave (Ctrl+Shift for ±5)",
+                "Press 1..4 to unlock ships (Shift+number to equip). 0 = unlock all",
+                "F3: frame profiler graph | F4: log frames to " + self.profile_log_path,
+                "H: restart in horde mode"
+            ]
+            quality = self.quality
+            if quality is not None:
+                dbg_lines.append(f"Quality {quality.level}/{len(quality.LEVELS) - 1}: particles "
+                                 f"{quality.particle_scale:.0%}, enemy detail {quality.enemy_detail}, HUD "
+                                 f"{'alpha' if quality.hud_alpha else 'opaque'} | {quality.mean_ms:.1f}/"
+                                 f"{quality.budget_ms:.1f} ms")
+                for frame, old, new, ms in reversed(quality.changes):
+                    dbg_lines.append(f"quality {old} -> {new} at frame {frame} ({ms:.1f} ms)")
+            y = 10
+            for line in dbg_lines:
+                surf = self.render_text(('debug', y), line, (200, 200, 100))
+                ui_rects.append(self.screen.blit(surf, (WIDTH - surf.get_width() - 10, y)))
+                y += 20
+            if self.latency is not None:
+                if self.latency.flips % 15 == 0:
+                    stats = self.latency.summary().get('aim')
+                    self.latency_summary = [
+                        f"aim latency p50 {stats['p50']:.1f} ms p99 {stats['p99']:.1f} ms"
+                        f" | late input {'on' if self.late_input else 'off'}"] if stats else []
+                for line in self.latency_summary:
+                    surf = self.render_text(('debug', y), line, (200, 200, 100))
+                    ui_rects.append(self.screen.blit(surf, (WIDTH - surf.get_width() - 10, y)))
+                    y += 20
+            if self.show_profiler and self.profiler:
+                ui_rects.append(self.draw_profiler(y + 5))
+        if timer: timer.lap('draw.overlay')
+        
+        self.flip_start = time.perf_counter()
+        if self.dirty_rects:
+            rects = self.entity_rects(sim) + ui_rects
+            update = self.prev_rects + rects
+            if partial and sum(r.w * r.h for r in update) < self.dirty_full_fraction * WIDTH * HEIGHT:
+                pygame.display.update(update)
+            else:
+                pygame.display.flip()
+            self.prev_rects = rects
+            # The shop overlay covers the whole screen, so leaving it needs a full redraw
+            self.full_redraw = sim.shop_open
+        else:
+            pygame.display.flip()
+        if interpolated:
+            self.restore_interpolation(interpolated)
+        if timer: timer.lap('draw.flip')
+    
+    def draw_scene(self, partial, timer=None):
+        """Draw the background, entities and HUD; returns the HUD's screen rects."""
+        sim = self.sim
+        if partial:
+            for rect in self.prev_rects:
+                self.screen.blit(self.background, rect, rect)
+        else:
+            self.screen.blit(self.background, (0, 0))
+        if timer: timer.lap('draw.background')
+        self.draw_entities(sim, timer)
+        
+        # UI
+        ui_rects = [self.screen.blit(self.hud_panel, (5, 5))]
+        
+        texts = [
+            (f"Score: {sim.score}", WHITE, 10),
+            (f"Wave: {sim.wave}", CYAN, 35),
+            (f"Lives: {sim.player.lives}", GREEN, 60),
+            (f"Coins: {sim.coins}", YELLOW, 85),
+            (f"Ship: {sim.player.ship_name}", sim.player.ship_color, 110),
+            ("Press S: Shop", (200, 200, 0), 135)
+        ]
+        for text, color, y in texts:
+            self.screen.blit(self.render_text(('hud', y), text, color), (10, y))
+        
+        if sim.horde is not None:
+            horde_text = self.render_text('horde', f"Horde: {len(sim.horde)} enemies | {self.frame_ms:.1f} ms/frame",
+                                          ORANGE)
+            ui_rects.append(self.screen.blit(horde_text, (WIDTH // 2 - horde_text.get_width() // 2, HEIGHT - 50)))
+        
+        if sim.player.weapon_timer > 0:
+            ui_rects.append(self.screen.blit(self.weapon_panel, (5, HEIGHT - 90)))
+            self.screen.blit(self.render_text('weapon', f"Weapon: {sim.player.weapon_type.upper()}", YELLOW), (10, HEIGHT - 85))
+            self.screen.blit(self.render_text('weapon_time', f"Time: {sim.player.weapon_timer // 60}s", WHITE), (10, HEIGHT - 60))
+        
+        if sim.wave_complete and sim.wave_timer > 60:
+            complete_text = self.render_text('wave_complete', "WAVE COMPLETE!", GREEN, self.font)
+            ui_rects.append(self.screen.blit(complete_text, (WIDTH // 2 - complete_text.get_width() // 2, HEIGHT // 2)))
+        
+        if not sim.shop_open:
+            mouse_pos = self.mouse_pos()
+            ui_rects.append(pygame.Rect(mouse_pos[0] - 13, mouse_pos[1] - 13, 27, 27))
+            pygame.draw.circle(self.screen, WHITE, mouse_pos, 8, 1)
+            for line in [((mouse_pos[0] - 12, mouse_pos[1]), (mouse_pos[0] - 4, mouse_pos[1])),
+                        ((mouse_pos[0] + 4, mouse_pos[1]), (mouse_pos[0] + 12, mouse_pos[1])),
+                        ((mouse_pos[0], mouse_pos[1] - 12), (mouse_pos[0], mouse_pos[1] - 4)),
+                        ((mouse_pos[0], mouse_pos[1] + 4), (mouse_pos[0], mouse_pos[1] + 12))]:
+                pygame.draw.line(self.screen, WHITE, line[0], line[1], 2)
+        
+        inst = self.render_text('instructions', "W: Thrust | Mouse: Aim & Shoot | SPACE: Shoot" +
+                                (" | Hold R: Rewind" if self.rewind_enabled else ""), (150, 150, 150))
+        ui_rects.append(self.screen.blit(inst, (WIDTH // 2 - inst.get_width() // 2, HEIGHT - 25)))
+        
+        if timer: timer.lap('draw.hud')
+        return ui_rects
+    
+    def draw_entities(self, sim, timer=None):
+        """Draw the particle, enemy, projectile and player layers of `sim`."""
+        detail = self.quality.enemy_detail if self.quality is not None else 2
+        sim.particles.draw(self.screen, self.sprites)
+        if timer: timer.lap('draw.particles')
+        if sim.boss: sim.boss.draw(self.screen, self.sprites)
+        for enemy in sim.enemies: enemy.draw(self.screen, self.sprites, detail)
+        if sim.horde is not None: sim.horde.draw(self.screen, self.sprites, detail)
+        if timer: timer.lap('draw.enemies')
+        PowerUp.draw_all(self.screen, sim.powerups, self.sprites)
+        Bullet.draw_all(self.screen, chain(sim.bullets, sim.boss_projectiles), self.sprites)
+        if timer: timer.lap('draw.projectiles')
+        for player in sim.players:
+            if player.lives > 0 or player is sim.player:
+                player.draw(self.screen)
+        if timer: timer.lap('draw.player')
+    
+    def toggle_profiler(self, graph=False, log=False):
+        """Flip the profiler graph and/or file logging; profiling runs while either is on."""
+        prof = self.profiler
+        if prof is None:
+            prof = self.profiler = FrameProfiler()
+        if graph:
+            self.show_profiler = not self.show_profiler
+        if log:
+            if prof.log_path:
+                prof.close()
+            else:
+                prof.log_path = self.profile_log_path
+        active = self.show_profiler or prof.log_path is not None
+        self.phase_timer = self.sim.phase_timer = prof if active else None
+    
+    def draw_profiler(self, top):
+        """Scrolling graph of recent frame times, stacked by phase group, plus the
+        slowest phase of the last second. Returns the screen rect it covers."""
+        prof = self.profiler
+        w, h, bar = 240, 90, 2
+        x0 = WIDTH - w - 10
+        graph = self.profiler_graph
+        if graph is None:
+            graph = self.profiler_graph = pygame.Surface((w, h))
+            graph.fill(BLACK)
+            self.profiler_drawn = prof.frames
+        # Two frame budgets fill the graph height
+        scale = h * FPS / 2
+        new = [r for r in prof.history if r[0] >= self.profiler_drawn][-(w // bar):]
+        if new:
+            graph.scroll(-bar * len(new))
+            graph.fill(BLACK, (w - bar * len(new), 0, bar * len(new), h))
+            for i, (_, _, phases, _, _) in enumerate(new):
+                x, y = w - bar * (len(new) - i), h
+                for group, color in PROFILER_GROUPS:
+                    t = sum(v for name, v in phases.items() if name.startswith(group))
+                    px = int(t * scale)
+                    if px:
+                        graph.fill(color, (x, y - px, bar, px))
+                        y -= px
+            self.profiler_drawn = new[-1][0] + 1
+            pygame.draw.line(graph, GRAY, (0, h // 2), (w, h // 2))
+        if not self.profiler_summary or prof.frames % 15 == 0:
+            window = list(prof.history)[-FPS:]
+            if window:
+                totals = [r[1] for r in window]
+                worst_frame, worst_name, worst = max(((r[0], name, t) for r in window for name, t in r[2].items()),
+                                                     key=lambda item: item[2], default=(0, '-', 0.0))
+                counts, state = window[-1][3], window[-1][4]
+                self.profiler_summary = [
+                    f"frame avg {sum(totals) / len(totals) * 1000:.2f} ms  max {max(totals) * 1000:.2f} ms",
+                    f"worst {worst_name} {worst * 1000:.2f} ms @ {worst_frame}",
+                    "  ".join(f"{name} {n}" for name, n in zip(FrameProfiler.COUNTS, counts)),
+                    "  ".join(f"{name} {v}" for name, v in zip(FrameProfiler.STATE, state)),
+                ]
+                if prof.log_path:
+                    self.profiler_summary.append("logging to " + prof.log_path)
+        rect = self.screen.blit(graph, (x0, top))
+        y = top + h + 4
+        for i, line in enumerate(self.profiler_summary):
+            surf = self.render_text(('profiler', i), line, (200, 200, 100))
+            rect.union_ip(self.screen.blit(surf, (WIDTH - surf.get_width() - 10, y)))
+            y += 18
+        return rect
+    
+    def entity_rects(self, sim):
+        """Screen rects covering everything the entity layers drew this frame."""
+        Rect = pygame.Rect
+        rects = []
+        particles = sim.particles
+        n = particles.count
+        if n:
+            for (x, y), size in zip(particles.pos[:n].astype(int).tolist(), particles.size[:n].tolist()):
+                rects.append(Rect(x - size, y - size, size * 2 + 1, size * 2 + 1))
+        boss = sim.boss
+        if boss:
+            half = boss.size + 3
+            rects.append(Rect(int(boss.x) - half, int(boss.y) - half, half * 2 + 1, half * 2 + 1))
+            rects.append(Rect(int(boss.x) - 81, int(boss.y) - boss.size - 31, 163, 14))
+        for enemy in sim.enemies:
+            half = int(enemy.size * 1.2) + 3
+            rects.append(Rect(int(enemy.x) - half, int(enemy.y) - half, half * 2 + 1, half * 2 + 1))
+        for powerup in sim.powerups:
+            half = powerup.radius + 6
+            rects.append(Rect(int(powerup.x) - half, int(powerup.y) - half, half * 2 + 1, half * 2 + 1))
+        for lst in (sim.bullets, sim.boss_projectiles):
+            for bullet in lst:
+                r = bullet.radius + 1
+                rects.append(Rect(int(bullet.x) - r, int(bullet.y) - r, r * 2 + 1, r * 2 + 1))
+        for player in sim.players:
+            half = player.radius + 8
+            rects.append(Rect(int(player.x) - half, int(player.y) - half, half * 2 + 1, half * 2 + 1))
+        screen_rect = self.screen.get_rect()
+        return [r.clip(screen_rect) for r in rects if r.colliderect(screen_rect)]
+    
+    def shop_key(self):
+        """Everything the open shop's frame shows: the frozen world and the shop state."""
+        sim = self.sim
+        return ('shop', id(sim), sim.frame, sim.wave, sim.coins, tuple(sim.owned_ships), sim.player.ship_type,
+                self.quality.level if self.quality is not None else None)
+    
+    def draw_shop_overlay(self):
+        sim = self.sim
+        if self.quality is None or self.quality.hud_alpha:
+            self.screen.blit(self.shop_dim, (0, 0))
+        else:
+            self.screen.fill((6, 6, 8))
+        
+        box = self.shop_box
+        pygame.draw.rect(self.screen, (20, 20, 30), box)
+        pygame.draw.rect(self.screen, CYAN, box, 3)
+        
+        title = self.font.render("SHIP SHOP", True, WHITE)
+        coins = self.small_font.render(f"Coins: {sim.coins}", True, YELLOW)
+        current = self.small_font.render(f"Current: {sim.player.ship_name}", True, sim.player.ship_color)
+        
+        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, box.y + 12))
+        self.screen.blit(coins, (WIDTH // 2 - coins.get_width() // 2, box.y + 50))
+        self.screen.blit(current, (WIDTH // 2 - current.get_width() // 2, box.y + 75))
+        
+        for rect, item in self.shop_rects:
+            owned = item['id'] in sim.owned_ships
+            equipped = item['id'] == sim.player.ship_type
+            
+            if equipped:
+                bg_color = (30, 60, 80)
+                border_color = CYAN
+            elif owned:
+                bg_color = (20, 50, 20)
+                border_color = GREEN
+            elif sim.coins >= item['cost']:
+                bg_color = (14, 14, 18)
+                border_color = YELLOW
+            else:
+                bg_color = (14, 14, 18)
+                border_color = (80, 80, 80)
+            
+            pygame.draw.rect(self.screen, bg_color, rect)
+            pygame.draw.rect(self.screen, border_color, rect, 2)
+            
+            name = self.small_font.render(item['name'], True, WHITE)
+            desc = self.small_font.render(item['desc'], True, (180, 180, 180))
+            stats = self.small_font.render(item['stats'], True, (150, 150, 200))
+            
+            self.screen.blit(name, (rect.x + 8, rect.y + 8))
+            self.screen.blit(desc, (rect.x + 8, rect.y + 32))
+            self.screen.blit(stats, (rect.x + 8, rect.y + 54))
+            
+            if equipped:
+                status = self.small_font.render("EQUIPPED", True, CYAN)
+                self.screen.blit(status, (rect.right - 100, rect.y + 28))
+            elif owned:
+                status = self.small_font.render("Click to Equip", True, GREEN)
+                self.screen.blit(status, (rect.right - 120, rect.y + 28))
+            else:
+                cost = self.small_font.render(f"Cost: {item['cost']}", True, YELLOW)
+                self.screen.blit(cost, (rect.right - 110, rect.y + 28))
+        
+        inst = self.small_font.render("Click ship to buy/equip | Press S to close", True, (180, 180, 180))
+        self.screen.blit(inst, (WIDTH // 2 - inst.get_width() // 2, box.bottom - 28))
+    
+    def push_history(self):
+        """Snapshot the simulation before a step, when the stride is due."""
+        if self.history_wait > 0:
+            self.history_wait -= 1
+            return
+        blob = self.sim.snapshot()
+        self.history_stride = self.history.stride(len(blob), KILL_CAM_FRAMES)
+        self.history.push(blob, len(self.recorder) if self.recorder is not None else None, self.history_stride)
+        self.history_wait = self.history_stride - 1
+    
+    def clear_history(self):
+        self.history.clear()
+        self.history_wait = 0
+    
+    def start_kill_cam(self):
+        """Take the snapshots covering the last KILL_CAM_FRAMES steps and the
+        final state for draw_game_over()."""
+        frames = self.history.covering(KILL_CAM_FRAMES) + [(self.sim.snapshot(), 1)]
+        self.kill_cam = [blob for blob, _ in frames]
+        # Step count at which each snapshot stops showing
+        self.kill_cam_ends = np.cumsum([steps for _, steps in frames]).tolist()
+        self.kill_cam_pos = 0.0
+        self.kill_cam_shown = None
+        if self.kill_cam_sim is None:
+            self.kill_cam_sim = GameSimulation(seed=self.sim.seed)
+    
+    def draw_game_over(self):
+        frames = self.kill_cam
+        playing = bool(frames) and self.kill_cam_pos < self.kill_cam_ends[-1]
+        key = ('game_over', id(self.sim), self.sim.score, self.sim.wave)
+        if not playing and key == self.menu_key:
+            # The kill cam is over (or there was none): the screen no longer changes
+            self.screen.blit(self.menu_frame, (0, 0))
+        else:
+            if frames:
+                # Half speed: one snapshot every two simulation steps' worth of render time
+                index = min(int(np.searchsorted(self.kill_cam_ends, self.kill_cam_pos, 'right')), len(frames) - 1)
+                self.kill_cam_pos += FPS / (2 * self.render_fps)
+                if index != self.kill_cam_shown:
+                    self.kill_cam_sim.restore(frames[index])
+                    self.kill_cam_shown = index
+                self.screen.blit(self.background, (0, 0))
+                self.draw_entities(self.kill_cam_sim)
+            
+            self.game_over_dim.set_alpha(90 if playing else 200)
+            self.screen.blit(self.game_over_dim, (0, 0))
+            if playing:
+                label = self.render_text('kill_cam', "KILL CAM", RED, self.font)
+                self.screen.blit(label, (WIDTH // 2 - label.get_width() // 2, 40))
+            
+            texts = [
+                ("GAME OVER", RED, -70),
+                (f"Final Score: {self.sim.score}", WHITE, -10),
+                (f"Wave Reached: {self.sim.wave}", CYAN, 30),
+                ("Press SPACE to restart", WHITE, 70)
+            ]
+            for text, color, y_offset in texts:
+                font = self.font if y_offset in [-70, -10] else self.small_font
+                rendered = self.render_text(('game_over', y_offset), text, color, font)
+                self.screen.blit(rendered, (WIDTH // 2 - rendered.get_width() // 2, HEIGHT // 2 + y_offset))
+            if not playing:
+                self.menu_frame.blit(self.screen, (0, 0))
+                self.menu_key = key
+        
+        self.flip_start = time.perf_counter()
+        pygame.display.flip()
+        self.full_redraw = True
+    
+    def run(self, playback=None, max_frames=None):
+        """Main loop. The simulation advances in fixed 1/FPS steps from an
+        accumulator (at most `max_catch_up` per rendered frame, so a stall slows
+        the game instead of snowballing), while frames render at `render_fps`.
+        `playback` is an iterable of InputCommands (e.g. Replay.commands())
+        shown in place of live input; set `self.recorder` to log live input.
+        With max_frames set, the loop ends after rendering that many frames."""
+        running = True
+        frames = 0
+        sim = self.sim
+        commands = iter(playback) if playback is not None else None
+        step_time = 1 / FPS
+        accumulator = step_time
+        last = time.perf_counter()
+        # Collects this frame's events; one-shot actions wait here for the next step
+        cmd = InputCommand()
+        if self.quality is not None:
+            self.quality.budget_ms = 1000 / self.render_fps
+        latency = self.latency
+        input_kinds = {pygame.MOUSEMOTION: 'aim', pygame.MOUSEBUTTONDOWN: 'button', pygame.KEYDOWN: 'key'}
+        self.next_flip = None
+        
+        while running:
+            if self.late_input:
+                self.wait_for_input()
+            frame_start = time.perf_counter()
+            timer = self.phase_timer
+            if timer: timer.start()
+            profiler_keys = {}
+            events = pygame.event.get()
+            pumped = time.perf_counter()
+            for event in events:
+                if latency is not None and event.type in input_kinds:
+                    latency.event(input_kinds[event.type], getattr(event, 't', pumped))
+                if event.type == pygame.MOUSEMOTION:
+                    self.motion_pos = event.pos
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4) \
+                        and getattr(self, 'debug_mode', False):
+                    profiler_keys['graph' if event.key == pygame.K_F3 else 'log'] = True
+                elif commands is not None:
+                    continue
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE and sim.game_over:
+                        cmd.restart = True
+                    # Debug shortcuts (always available when debug_mode True)
+                    if getattr(self, 'debug_mode', False):
+                        mods = pygame.key.get_mods()
+                        # Ctrl + Up/Down to change wave by 1; Ctrl+Shift+Up/Down to change by 5
+                        if mods & pygame.KMOD_CTRL:
+                            if event.key == pygame.K_UP:
+                                cmd.wave_delta += 5 if (mods & pygame.KMOD_SHIFT) else 1
+                            elif event.key == pygame.K_DOWN:
+                                cmd.wave_delta -= 5 if (mods & pygame.KMOD_SHIFT) else 1
+                        # Number keys 1..4 unlock the shop ships in order (Shift+number to equip)
+                        unlock_keys = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]
+                        if event.key in unlock_keys:
+                            cmd.unlock = unlock_keys.index(event.key)
+                            cmd.equip = bool(mods & pygame.KMOD_SHIFT)
+                        elif event.key == pygame.K_0:
+                            cmd.unlock = 'all'
+                        elif event.key == pygame.K_h:
+                            cmd.horde = True
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1 and sim.shop_open:
+                        for rect, item in self.shop_rects:
+                            if rect.collidepoint(event.pos):
+                                cmd.shop_pick = sim.shop_items.index(item)
+                                break
+            if timer: timer.lap('input.events')
+            
+            now = time.perf_counter()
+            accumulator = min(accumulator + now - last, self.max_catch_up * step_time)
+            last = now
+            steps = int(accumulator / step_time)
+            rewind = (self.rewind_enabled and commands is None and steps and not sim.game_over
+                      and pygame.key.get_pressed()[pygame.K_r])
+            for i in range(steps):
+                if rewind:
+                    # Each step slot undoes one step, dropping its recorded input too;
+                    # a snapshot standing for several steps is restored after that many slots
+                    if self.history_wait < 0:
+                        self.history_wait += 1
+                    elif self.history:
+                        blob, tag, span = self.history.pop()
+                        sim.restore(blob)
+                        if self.recorder is not None:
+                            self.recorder.truncate(tag)
+                        self.history_wait = 1 - span
+                    self.prev_positions = {}
+                    accumulator -= step_time
+                    continue
+                if not sim.game_over:
+                    if self.history_wait < 0:
+                        # Leaving a rewind: the restored state has no entry yet
+                        self.history_wait = 0
+                    self.push_history()
+                if commands is not None:
+                    step_cmd = next(commands, None)
+                    if step_cmd is None:
+                        running = False
+                        break
+                else:
+                    if i == 0:
+                        if not sim.game_over or cmd.restart:
+                            self.read_input(cmd)
+                            if latency is not None:
+                                latency.sample(time.perf_counter())
+                        if timer: timer.lap('input.read')
+                        step_cmd = cmd
+                    else:
+                        # Catch-up steps repeat the held controls, not one-shot actions
+                        step_cmd = InputCommand(cmd.aim_angle, cmd.rotate, cmd.thrust, cmd.fire)
+                    if self.recorder is not None:
+                        step_cmd = self.recorder.record(step_cmd)
+                if i == steps - 1 and self.interpolate:
+                    self.snapshot_positions()
+                sim.step(step_cmd)
+                if step_cmd.restart or step_cmd.horde:
+                    self.clear_history()
+                    self.kill_cam = None
+                accumulator -= step_time
+            if steps:
+                cmd = InputCommand()
+            if not running:
+                break
+            if sim.game_over and self.kill_cam is None:
+                self.start_kill_cam()
+            
+            if sim.game_over:
+                self.draw_game_over()
+            else:
+                self.draw(accumulator / step_time if self.interpolate else 1.0)
+            flipped = time.perf_counter()
+            if latency is not None:
+                latency.flip(flipped)
+            self.frame_work.append(self.flip_start - frame_start)
+            if self.late_input and self.vsync:
+                # A vsynced flip returns at the refresh; keep the schedule in step with it
+                self.next_flip = flipped
+            self.frame_ms = (flipped - frame_start) * 1000
+            self.update_quality(self.frame_ms)
+            if isinstance(timer, FrameProfiler):
+                timer.end_frame(sim)
+            if profiler_keys:
+                self.toggle_profiler(**profiler_keys)
+            
+            frames += 1
+            if max_frames is not None and frames >= max_frames:
+                break
+            
+            if self.late_input:
+                # wait_for_input() paces the loop; tick() just keeps the clock's stats
+                self.clock.tick()
+            else:
+                self.clock.tick(self.render_fps)
+        
+        if self.profiler:
+            self.profiler.close()
+        pygame.quit()
+
+def run_headless(sim, frames, profiler=None):
+    """Step `sim` with idle input for `frames` frames (or until game over) as fast as possible."""
+    cmd = InputCommand()
+    sim.phase_timer = profiler
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        if not sim.step(cmd):
+            break
+        if profiler:
+            profiler.end_frame(sim)
+    elapsed = time.perf_counter() - t0
+    sim.phase_timer = None
+    if profiler:
+        profiler.close()
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geometric Asteroids")
+    parser.add_argument('--headless', action='store_true',
+                        help='run the simulation without a window and print a summary')
+    parser.add_argument('--seed', type=int, help='seed for every random roll in the game')
+    parser.add_argument('--wave', type=int, default=1, help='starting wave')
+    parser.add_argument('--ship', default='basic', choices=SHIP_TYPES)
+    parser.add_argument('--horde', type=int, metavar='N', help='play horde mode with up to N enemies')
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help='render rate; the simulation always steps at %d Hz' % FPS)
+    parser.add_argument('--frames', type=int,
+                        help='quit after this many frames (headless default: %d)' % (60 * FPS))
+    parser.add_argument('--profile', nargs='?', const='frame_profile.csv', metavar='PATH',
+                        help='log per-frame phase timings to PATH (.csv or .jsonl)')
+    parser.add_argument('--vsync', action='store_true', help='wait for the display refresh on every flip')
+    parser.add_argument('--late-input', action='store_true',
+                        help='sleep before reading input instead of after drawing, to show it sooner')
+    parser.add_argument('--latency', action='store_true',
+                        help='time input events to the flip that shows them and print the distribution on exit')
+    parser.add_argument('--inject-input', type=float, metavar='HZ',
+                        help='post synthetic mouse motion about HZ times a second (implies --latency)')
+    args = parser.parse_args(argv)
+
+    sim = GameSimulation(args.ship, seed=args.seed)
+    if args.horde:
+        sim.start_horde(args.horde)
+    if args.wave > 1:
+        sim.enemies.clear()
+        sim.wave = args.wave
+        if sim.horde is None:
+            sim.spawn_wave()
+
+    if args.headless:
+        frames = args.frames if args.frames is not None else 60 * FPS
+        profiler = FrameProfiler(log_path=args.profile) if args.profile else None
+        elapsed = run_headless(sim, frames, profiler)
+        enemies = len(sim.horde) if sim.horde is not None else len(sim.enemies)
+        print(f"seed {sim.seed}: {sim.frame} frames in {elapsed:.2f} s ({sim.frame / max(elapsed, 1e-9):.0f} steps/s)"
+              f" | wave {sim.wave} score {sim.score} lives {sim.player.lives} enemies {enemies}"
+              f"{' | game over' if sim.game_over else ''}")
+        return 0
+
+    game = GeometricAsteroids(sim, vsync=args.vsync)
+    game.render_fps = args.fps
+    game.late_input = args.late_input
+    if args.profile:
+        game.profile_log_path = args.profile
+        game.toggle_profiler(log=True)
+    if args.latency or args.inject_input:
+        game.latency = InputLatency()
+    stop = threading.Event()
+    if args.inject_input:
+        threading.Thread(target=inject_mouse_motion, args=(args.inject_input, stop), daemon=True).start()
+    try:
+        game.run(max_frames=args.frames)
+    finally:
+        stop.set()
+    if game.latency is not None:
+        print(f"input latency ({'late' if args.late_input else 'early'} input sampling"
+              f"{', vsync' if args.vsync else ''}, {args.fps} fps)")
+        for line in game.latency.report():
+            print("  " + line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Co-op snapshot quantization and delta encoding, server capture to client mirror."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import coop
+import geometric_asteroids as game
+
+POS_STEP = 0.5 / coop.POS_SCALE
+ANGLE_STEP = 0.5 / coop.ANGLE_SCALE
+VEL_STEP = 0.5 / coop.VEL_SCALE
+
+
+def server_world(seed=3):
+    sim = game.GameSimulation(seed=seed)
+    sim.add_player('tank')
+    # A regular wave with a (projectile-firing) boss added on top
+    sim.wave = 7
+    sim.spawn_wave()
+    sim.boss = game.BossEnemy(game.WIDTH / 2, game.HEIGHT / 3, 2, rng=sim.rng)
+    sim.powerups.append(sim.powerup_pool.acquire(123.4, 321.9, 'rapid'))
+    for frame in range(40):
+        sim.boss.attack_timer = 0 if frame % 10 == 0 else sim.boss.attack_timer
+        sim.step([game.InputCommand(aim_angle=frame * 9.3, thrust=True, fire=True),
+                  game.InputCommand(aim_angle=-frame * 4.1, fire=True)])
+    return sim
+
+
+def mirror(sim, seat=0):
+    client = coop.CoopClient(None, None, sim.players[seat].ship_type)
+    client.seat = seat
+    client.sim = game.GameSimulation(client.ship, seed=sim.seed)
+    client.sim.enemies.clear()
+    return client
+
+
+def check_mirror(server, client):
+    sim = client.sim
+    assert [p.ship_type for p in sim.players] == [p.ship_type for p in server.players]
+    for theirs, ours in zip(server.players, sim.players):
+        assert ours.x == pytest.approx(theirs.x, abs=POS_STEP)
+        assert ours.y == pytest.approx(theirs.y, abs=POS_STEP)
+        assert ours.vel_x == pytest.approx(theirs.vel_x, abs=VEL_STEP)
+        assert ours.vel_y == pytest.approx(theirs.vel_y, abs=VEL_STEP)
+        assert ours.angle == pytest.approx(theirs.angle % 360, abs=ANGLE_STEP)
+        assert ours.lives == theirs.lives
+    assert len(sim.enemies) == len(server.enemies)
+    for theirs, ours in zip(server.enemies, sim.enemies):
+        assert (ours.x, ours.y) == pytest.approx((theirs.x, theirs.y), abs=POS_STEP)
+        assert ours.angle == pytest.approx(theirs.angle % 360, abs=ANGLE_STEP)
+        assert (ours.size, ours.shape_type, ours.role_code) == (theirs.size, theirs.shape_type, theirs.role_code)
+    assert (sim.boss.x, sim.boss.y) == pytest.approx((server.boss.x, server.boss.y), abs=POS_STEP)
+    for ours, theirs in ((sim.bullets, server.bullets), (sim.boss_projectiles, server.boss_projectiles)):
+        assert len(ours) == len(theirs)
+        for a, b in zip(ours, theirs):
+            assert (a.x, a.y) == pytest.approx((b.x, b.y), abs=POS_STEP)
+    assert [u.type for u in sim.powerups] == [u.type for u in server.powerups]
+    for a, b in zip(sim.powerups, server.powerups):
+        assert (a.x, a.y) == pytest.approx((b.x, b.y), abs=POS_STEP)
+    assert (sim.score, sim.coins, sim.wave) == (server.score, server.coins, server.wave)
+
+
+def test_full_then_delta_snapshot_round_trip():
+    server = server_world()
+    assert server.enemies and server.bullets and server.boss_projectiles and server.powerups
+    net_ids = {kind: coop.NetIds() for kind in ('enemies', 'bullets', 'powerups')}
+    client = mirror(server)
+
+    base = coop.capture(server, net_ids)
+    received = coop.decode(coop.encode(base))
+    client.apply(received)
+    check_mirror(server, client)
+
+    # Some steps later an enemy and a bullet are gone on the server
+    for _ in range(5):
+        server.step([game.InputCommand(), game.InputCommand()])
+    gone = server.enemies.pop(1)
+    server.bullets.pop()
+    state = coop.capture(server, net_ids)
+    delta = coop.decode(coop.encode(state, base), received)
+    # The delta rebuilds exactly what a full snapshot carries
+    full = coop.decode(coop.encode(state))
+    assert delta[0] == full[0]
+    for kind in coop.KINDS:
+        assert (delta[1][kind][0] == full[1][kind][0]).all()
+        assert (delta[1][kind][1] == full[1][kind][1]).all()
+    client.apply(delta)
+    check_mirror(server, client)
+    assert not any(e.x == pytest.approx(gone.x, abs=POS_STEP) and e.y == pytest.approx(gone.y, abs=POS_STEP)
+                   for e in client.sim.enemies)
+    assert set(client.last_enemies) == set(state[1]['enemies'][0].tolist())
+
+
+def test_quantization_clips_to_int16():
+    rows = coop.quantize([(1e9, -1e9, 12.6, 0, 0, 0, 0)], 'enemies')
+    assert rows.dtype.name == 'int16'
+    assert rows[0].tolist()[:3] == [32767, -32768, 13]
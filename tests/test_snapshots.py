@@ -0,0 +1,117 @@
+"""GameSimulation snapshots, the SnapshotRing and the kill cam built on them."""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geometric_asteroids as game
+
+
+def full_horde(target, seed=1):
+    sim = game.GameSimulation(seed=seed)
+    sim.start_horde(target)
+    sim.player.lives = 10 ** 6
+    while len(sim.horde) < target:
+        sim.horde_threat = target
+        sim.spawn_horde()
+    return sim
+
+
+def test_kill_cam_covers_a_big_horde():
+    sim = full_horde(5000)
+    view = game.GeometricAsteroids(sim)
+    cmd = game.InputCommand(fire=True)
+    for _ in range(2 * game.KILL_CAM_FRAMES):
+        view.push_history()
+        sim.step(cmd)
+    # Too big for a snapshot per step: the ring holds only a handful of entries
+    assert view.history_stride > 1
+    assert len(view.history) * view.history_stride >= game.KILL_CAM_FRAMES
+    view.start_kill_cam()
+    first = game.GameSimulation(seed=1)
+    first.restore(view.kill_cam[0])
+    assert sim.frame - first.frame >= game.KILL_CAM_FRAMES
+    assert view.kill_cam_ends[-1] > game.KILL_CAM_FRAMES
+
+
+def busy_world(seed=5):
+    """A co-op horde game with a boss firing, bullets in flight and powerups about."""
+    sim = full_horde(300, seed)
+    sim.add_player('tank')
+    sim.coop_players[0].lives = 10 ** 6
+    sim.wave = 8
+    sim.spawn_wave()
+    sim.boss.x, sim.boss.y = game.WIDTH / 2, game.HEIGHT / 3
+    sim.boss.health = sim.boss.max_health = 10 ** 6
+    for kind in ('spread', 'rapid', 'life'):
+        sim.powerups.append(sim.powerup_pool.acquire(sim.rng.uniform(0, game.WIDTH),
+                                                     sim.rng.uniform(0, game.HEIGHT), kind))
+    frame = 0
+    # Run a while, then on until bullets and boss projectiles are both in flight
+    while frame < 90 or not (sim.bullets and sim.boss_projectiles):
+        if frame % 5 == 0:
+            sim.boss.attack_timer = 0
+        sim.step(commands(frame))
+        frame += 1
+    return sim, frame
+
+
+def commands(frame):
+    return [game.InputCommand(aim_angle=frame * 7 % 360, thrust=frame % 3 == 0, fire=True),
+            game.InputCommand(aim_angle=frame * 11 % 360, rotate=1, fire=frame % 2 == 0)]
+
+
+def test_restore_continues_bit_identically():
+    sim, start = busy_world()
+    assert sim.boss and sim.boss_projectiles and sim.bullets and sim.powerups and len(sim.horde)
+    assert len(sim.players) == 2 and len(sim.particles)
+    blob = sim.snapshot()
+    copy = game.GameSimulation(seed=999)
+    copy.restore(blob)
+    assert copy.snapshot() == blob
+    for frame in range(start, start + 150):
+        sim.step(commands(frame))
+        copy.step(commands(frame))
+        assert copy.snapshot() == sim.snapshot(), frame
+
+
+def test_ring_wraps_and_evicts_oldest():
+    ring = game.SnapshotRing(capacity=100)
+    for i in range(3):
+        assert ring.push(bytes([i]) * 30, tag=i)
+    assert ring.head == 90
+    # Doesn't fit after 90: starts again at the front, over entry 0
+    assert ring.push(b'\x03' * 30, tag=3)
+    assert ring.head == 30
+    assert [tag for tag, *_ in ring.entries] == [1, 2, 3]
+    assert ring.recent(2) == [b'\x02' * 30, b'\x03' * 30]
+    # A bigger entry overwrites every entry it overlaps
+    assert ring.push(b'\x04' * 40, tag=4, steps=3)
+    assert ring.head == 70
+    assert [tag for tag, *_ in ring.entries] == [3, 4]
+    assert ring.covering(2) == [(b'\x04' * 40, 3)]
+    assert ring.covering(4) == [(b'\x03' * 30, 1), (b'\x04' * 40, 3)]
+    assert ring.pop() == (b'\x04' * 40, 4, 3)
+    assert ring.head == 30
+    assert ring.pop() == (b'\x03' * 30, 3, 1)
+    assert len(ring) == 0
+
+
+def test_ring_wrap_drops_entries_past_the_head():
+    ring = game.SnapshotRing(capacity=100)
+    for i in range(4):
+        ring.push(bytes([i]) * 30, tag=i)
+    # Entries 1 and 2 sit between the head (30) and the end; wrapping an
+    # 80-byte blob drops them, then overwrites entry 3 at the front
+    assert ring.push(b'\x04' * 80, tag=4)
+    assert [tag for tag, *_ in ring.entries] == [4]
+    assert ring.head == 80
+
+
+def test_ring_refuses_oversized_blob():
+    ring = game.SnapshotRing(capacity=64)
+    assert ring.push(b'x' * 10)
+    assert not ring.push(b'y' * 65)
+    assert len(ring) == 0 and ring.head == 0
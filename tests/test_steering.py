@@ -0,0 +1,53 @@
+"""Batched steering (SteeringBatch / steer_arrays) against GeometricEnemy.update()."""
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import geometric_asteroids as game
+
+ROLES = [None, 'swarm', 'dasher', 'shield']
+TIMERS = ('zig_timer', 'dash_timer', '_dash_ticks', 'shield_timer')
+FLAGS = ('is_dashing', 'shield_active')
+
+
+def make_enemies(seed, count=40):
+    # One shared stream, so the two paths must also draw from it in the same order
+    rng = random.Random(seed)
+    shapes = list(game.GeometricEnemy.SHAPES)
+    return [game.GeometricEnemy(rng.uniform(0, game.WIDTH), rng.uniform(0, game.HEIGHT), rng.choice(shapes),
+                                rng.randint(10, 40), ROLES[i % len(ROLES)], rng=rng)
+            for i in range(count)]
+
+
+def targets_at(frame, players):
+    # Targets circle the screen centre so enemies keep turning, dashing and wrapping
+    return [(game.WIDTH / 2 + 300 * math.cos(frame / 40 + k), game.HEIGHT / 2 + 200 * math.sin(frame / 55 + k))
+            for k in range(players)]
+
+
+def nearest(targets, enemy):
+    return min(targets, key=lambda t: (t[0] - enemy.x) ** 2 + (t[1] - enemy.y) ** 2)
+
+
+@pytest.mark.parametrize('players', [1, 2])
+@pytest.mark.parametrize('seed', [1, 7, 42])
+def test_batch_matches_scalar(seed, players):
+    scalar, batched = make_enemies(seed), make_enemies(seed)
+    batch = game.SteeringBatch()
+    for frame in range(600):
+        ticks = frame * 1000 // game.FPS
+        targets = targets_at(frame, players)
+        for enemy in scalar:
+            enemy.update(*nearest(targets, enemy), ticks)
+        batch.update(batched, targets, ticks)
+        for a, b in zip(scalar, batched):
+            for field in ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'angle'):
+                assert getattr(b, field) == pytest.approx(getattr(a, field), abs=1e-6), (frame, field)
+            for field in TIMERS + FLAGS:
+                assert getattr(b, field) == getattr(a, field), (frame, field)
+    assert scalar[0].rng.random() == batched[0].rng.random()